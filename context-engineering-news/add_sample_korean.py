@@ -3,21 +3,82 @@
 샘플 한글 번역 데이터를 추가하여 즉시 확인할 수 있도록 하는 스크립트
 """
 
-import json
-import shutil
 import os
 
+from src.fs_utils import link_or_copy
+from src.json_utils import load_json, dump_json, dumps_json, WRITE_BUFFER_SIZE
+
+# ijson이 있으면 전체 문서를 메모리에 올리지 않고 기사 단위로 스트리밍 처리
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+NEWS_DATA_FILE = 'data/daily_news.json'
+KOREAN_FIELDS = ('korean_title', 'korean_summary', 'korean_keywords')
+
+def _apply_translation(item, translations_by_title):
+    """제목이 일치하는 샘플 번역을 기사에 적용"""
+    translation = translations_by_title.get(item.get('title'))
+    if translation is None:
+        return False
+    
+    item.update({field: translation[field] for field in KOREAN_FIELDS})
+    return True
+
+def _read_metadata(path, skip_key='items'):
+    """items를 제외한 최상위 필드만 스트리밍으로 읽기"""
+    metadata = {}
+    key = None
+    builder = None
+    
+    with open(path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == '' and event in ('map_key', 'end_map'):
+                if builder is not None:
+                    metadata[key] = builder.value
+                key = value
+                builder = None if event == 'end_map' or value == skip_key else ijson.ObjectBuilder()
+            elif builder is not None:
+                builder.event(event, value)
+    
+    return metadata
+
+def _stream_translations(path, translations_by_title):
+    """기사를 하나씩 읽어 번역을 적용하고 임시 파일에 쓴 뒤 원자적으로 교체"""
+    metadata = _read_metadata(path)
+    translated_count = 0
+    tmp_path = f"{path}.tmp"
+    
+    try:
+        with open(path, 'rb') as src, open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as dst:
+            dst.write(b'{')
+            for key, value in metadata.items():
+                dst.write(dumps_json(key) + b':' + dumps_json(value) + b',')
+            
+            dst.write(b'"items":[')
+            for index, item in enumerate(ijson.items(src, 'items.item', use_float=True)):
+                translated_count += _apply_translation(item, translations_by_title)
+                if index:
+                    dst.write(b',\n')
+                dst.write(dumps_json(item))
+            dst.write(b']}')
+        
+        os.replace(tmp_path, path)
+    except BaseException:
+        # 파싱/쓰기 실패 시 반쯤 쓴 임시 파일을 남기지 않음
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return translated_count
+
 def add_sample_translations():
     """샘플 한글 번역 데이터 추가"""
     print("🇰🇷 샘플 한글 번역 데이터 추가 중...")
     
-    try:
-        with open('data/daily_news.json', 'r', encoding='utf-8') as f:
-            news_data = json.load(f)
-    except FileNotFoundError:
-        print("❌ data/daily_news.json 파일을 찾을 수 없습니다.")
-        return False
-    
     # 샘플 번역 데이터 (첫 5개 기사에 샘플 번역 추가)
     sample_translations = [
         {
@@ -52,29 +113,25 @@ def add_sample_translations():
         }
     ]
     
-    # 샘플 번역 적용
-    items = news_data['items']
-    translated_count = 0
-    
-    for translation in sample_translations:
-        for item in items:
-            if item['title'] == translation['title']:
-                item.update({
-                    'korean_title': translation['korean_title'],
-                    'korean_summary': translation['korean_summary'],
-                    'korean_keywords': translation['korean_keywords']
-                })
-                translated_count += 1
-                break
+    # 샘플 번역 적용 및 결과 저장
+    translations_by_title = {translation['title']: translation for translation in sample_translations}
     
-    # 결과 저장
     try:
-        with open('data/daily_news.json', 'w', encoding='utf-8') as f:
-            json.dump(news_data, f, indent=2, ensure_ascii=False)
+        if IJSON_AVAILABLE:
+            translated_count = _stream_translations(NEWS_DATA_FILE, translations_by_title)
+        else:
+            news_data = load_json(NEWS_DATA_FILE)
+            translated_count = sum(
+                _apply_translation(item, translations_by_title) for item in news_data['items']
+            )
+            dump_json(news_data, NEWS_DATA_FILE, pretty=False)
         
         print(f"✅ {translated_count}개 기사에 샘플 한글 번역 추가 완료")
         return True
         
+    except FileNotFoundError:
+        print("❌ data/daily_news.json 파일을 찾을 수 없습니다.")
+        return False
     except Exception as e:
         print(f"❌ 파일 저장 실패: {e}")
         return False
@@ -93,8 +150,8 @@ def regenerate_html():
             output_file="docs/index.html"
         )
         
-        # 루트 docs에도 복사
-        shutil.copy("docs/index.html", "../docs/index.html")
+        # 루트 docs에도 하드링크 (다른 파일시스템이면 복사)
+        link_or_copy("docs/index.html", "../docs/index.html")
         
         print("✅ HTML 뉴스레터 재생성 완료")
         print("📖 docs/index.html 파일에서 한글 번역 확인 가능")
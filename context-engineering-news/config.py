@@ -17,7 +17,8 @@ CONFIG_DIR = BASE_DIR / "config"
 for directory in [DATA_DIR, DOCS_DIR]:
     directory.mkdir(exist_ok=True)
 
-# API Keys (from environment variables)
+# API Keys (from environment variables, read once at import)
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
@@ -16,13 +16,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from news_scraper import ContextEngineeringNewsScraper
 from html_generator import NewsletterGenerator
 from rss_generator import RSSGenerator
-
-# Try to import AI summarizer
-try:
-    from ai_summarizer import AISummarizer
-    AI_AVAILABLE = True
-except ImportError:
-    AI_AVAILABLE = False
+from json_utils import load_json, dump_json
 
 # Setup logging
 logging.basicConfig(
@@ -42,7 +36,14 @@ def ensure_directories():
         Path(directory).mkdir(exist_ok=True)
         logger.info(f"Ensured directory exists: {directory}")
 
-def run_news_pipeline(use_ai: bool = True, verbose: bool = False):
+def prettify_data_files():
+    """Rewrite the machine-oriented JSON data files with indentation for reading"""
+    for data_file in ("data/daily_news.json", "data/enhanced_news.json", "data/stats.json"):
+        if os.path.exists(data_file):
+            dump_json(load_json(data_file), data_file)
+            logger.info(f"Pretty-printed {data_file}")
+
+def run_news_pipeline(use_ai: bool = True, verbose: bool = False, pretty: bool = False):
     """Run the complete news generation pipeline"""
     if verbose:
         logging.getLogger().setLevel(logging.DEBUG)
@@ -68,9 +69,11 @@ def run_news_pipeline(use_ai: bool = True, verbose: bool = False):
         
         # Step 3: AI Enhancement (optional)
         data_file = "data/daily_news.json"
-        if use_ai and AI_AVAILABLE:
+        if use_ai:
             logger.info("🤖 Step 2: Enhancing news with AI summaries and Korean translation...")
             try:
+                # Imported here so --no-ai runs skip the summarizer entirely
+                from ai_summarizer import AISummarizer
                 summarizer = AISummarizer()
                 if summarizer.is_available():
                     enhanced_data = summarizer.enhance_news_data(
@@ -85,63 +88,78 @@ def run_news_pipeline(use_ai: bool = True, verbose: bool = False):
                         logger.warning("⚠️  AI enhancement failed, using original data")
                 else:
                     logger.warning("⚠️  No AI services available for enhancement")
+            except ImportError as e:
+                logger.warning(f"⚠️  AI summarizer unavailable ({e}), using original data")
             except Exception as e:
                 logger.error(f"AI enhancement failed: {e}")
         else:
             logger.info("🙂 Skipping AI enhancement")
         
+        # The HTML, RSS and stats steps share one parsed copy of the data file
+        news_data = load_json(data_file)
+        
         # Step 4: Generate HTML Newsletter
         logger.info("📰 Step 3: Generating HTML newsletter...")
         html_generator = NewsletterGenerator()
         html_content = html_generator.generate_html(
             data_file=data_file,
             template_file="templates/simple_newsletter.html",
-            output_file="docs/index.html"
+            output_file="docs/index.html",
+            news_data=news_data
         )
         logger.info("✅ HTML newsletter generated")
         
         # Step 5: Generate RSS Feeds
         logger.info("📡 Step 4: Generating RSS feeds...")
         rss_generator = RSSGenerator()
-        rss_generator.generate_feeds(data_file)
+        rss_generator.generate_feeds(data_file, news_data=news_data)
         logger.info("✅ RSS feeds generated")
         
         # Step 6: Generate summary report
         logger.info("📊 Step 5: Generating summary report...")
-        stats = html_generator.generate_summary_stats(data_file)
+        stats = html_generator.generate_summary_stats(data_file, news_data=news_data)
         
         # Create a simple stats file
-        with open("data/stats.json", 'w') as f:
-            import json
-            json.dump(stats, f, indent=2)
+        dump_json(stats, "data/stats.json")
         
-        # Print final summary
-        print("\n" + "="*60)
-        print(f"🎉 Context Engineering Daily News - {datetime.now().strftime('%Y-%m-%d')}")
-        print("="*60)
-        print(f"📰 Total articles collected: {stats['total_items']}")
-        print(f"🗺️ Categories covered: {len(stats['category_distribution'])}")
-        print(f"📜 Sources used: {len(stats['source_distribution'])}")
+        if pretty:
+            prettify_data_files()
         
-        print("\n📈 Category breakdown:")
-        for category, count in stats['category_distribution'].items():
-            category_name = category.replace('_', ' ').title()
-            print(f"  • {category_name}: {count} articles")
+        # Data files are written with plain buffered I/O; sync them to disk
+        # once here instead of paying for an fsync per file
+        if hasattr(os, 'sync'):
+            os.sync()
         
-        print("\n📊 Quality distribution:")
-        print(f"  • High relevance (70%+): {stats['quality_distribution']['high']} articles")
-        print(f"  • Medium relevance (40-69%): {stats['quality_distribution']['medium']} articles")
-        print(f"  • Lower relevance (<40%): {stats['quality_distribution']['low']} articles")
-        
-        print("\n🔗 Generated files:")
-        print("  • HTML Newsletter: docs/index.html")
-        print("  • Main RSS Feed: docs/rss.xml")
-        print("  • Category RSS Feeds: docs/rss-*.xml")
-        print("  • Raw Data: data/daily_news.json")
+        # Print final summary (assembled first, written with a single print)
+        quality = stats['quality_distribution']
+        lines = [
+            "\n" + "="*60,
+            f"🎉 Context Engineering Daily News - {datetime.now().strftime('%Y-%m-%d')}",
+            "="*60,
+            f"📰 Total articles collected: {stats['total_items']}",
+            f"🗺️ Categories covered: {len(stats['category_distribution'])}",
+            f"📜 Sources used: {len(stats['source_distribution'])}",
+            "\n📈 Category breakdown:",
+        ]
+        lines.extend(
+            f"  • {category.replace('_', ' ').title()}: {count} articles"
+            for category, count in stats['category_distribution'].items()
+        )
+        lines += [
+            "\n📊 Quality distribution:",
+            f"  • High relevance (70%+): {quality['high']} articles",
+            f"  • Medium relevance (40-69%): {quality['medium']} articles",
+            f"  • Lower relevance (<40%): {quality['low']} articles",
+            "\n🔗 Generated files:",
+            "  • HTML Newsletter: docs/index.html",
+            "  • Main RSS Feed: docs/rss.xml",
+            "  • Category RSS Feeds: docs/rss-*.xml",
+            "  • Raw Data: data/daily_news.json",
+        ]
         if data_file == "data/enhanced_news.json":
-            print("  • Enhanced Data: data/enhanced_news.json")
-        
-        print("\n🎆 Pipeline completed successfully!")
+            lines.append("  • Enhanced Data: data/enhanced_news.json")
+        lines.append("\n🎆 Pipeline completed successfully!")
+        print("\n".join(lines))
         return True
         
     except Exception as e:
@@ -160,6 +178,7 @@ Examples:
   python run_daily_news.py --no-ai           # Skip AI enhancement
   python run_daily_news.py --verbose         # Verbose logging
   python run_daily_news.py --no-ai --verbose # Skip AI with verbose logging
+  python run_daily_news.py --pretty          # Indent JSON data files for reading
 """
     )
     
@@ -175,12 +194,19 @@ Examples:
         help='Enable verbose logging'
     )
     
+    parser.add_argument(
+        '--pretty', 
+        action='store_true', 
+        help='Pretty-print the JSON data files after the run'
+    )
+    
     args = parser.parse_args()
     
     # Run the pipeline
     success = run_news_pipeline(
         use_ai=not args.no_ai, 
-        verbose=args.verbose
+        verbose=args.verbose,
+        pretty=args.pretty
     )
     
     sys.exit(0 if success else 1)
@@ -3,165 +3,632 @@
 AI-powered summarization and enhancement for Context Engineering news
 """
 
+import asyncio
+import importlib.util
 import json
 import os
-from typing import List, Dict, Optional
+import random
+import re
+from collections import defaultdict
+from typing import Awaitable, Callable, List, Dict, Optional, Iterator
 from datetime import datetime
 import logging
+import threading
 import time
 
-# Import Gemini AI library (only free AI service we use)
 try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
+    from .json_utils import load_json, dump_json, dumps_json
+    from .llm_cache import LLMCache
+except ImportError:
+    from json_utils import load_json, dump_json, dumps_json
+    from llm_cache import LLMCache
+
+# API key is read from the environment once, in config.py
+try:
+    from config import GEMINI_API_KEY
+except ImportError:
+    GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+
+# Gemini AI library (only free AI service we use). It pulls in grpc/protobuf,
+# so only check that it is installed here and import it in AISummarizer.
+try:
+    GEMINI_AVAILABLE = importlib.util.find_spec('google.generativeai') is not None
 except ImportError:
     GEMINI_AVAILABLE = False
+if not GEMINI_AVAILABLE:
     print("⚠️ Gemini AI library not installed. Install with: pip install google-generativeai")
 
 logger = logging.getLogger(__name__)
 
+GEMINI_MODEL = 'gemini-1.5-flash'
+
+# Cheaper model that takes over an enhancement batch when GEMINI_MODEL has not
+# answered within GEMINI_PRIMARY_TIMEOUT seconds or fails; an empty
+# GEMINI_FALLBACK_MODEL disables the fallback
+GEMINI_FALLBACK_MODEL = os.getenv('GEMINI_FALLBACK_MODEL', 'gemini-1.5-flash-8b')
+PRIMARY_TIMEOUT = float(os.getenv('GEMINI_PRIMARY_TIMEOUT', '45'))
+
+# Persistent Gemini response cache (prompt hash -> response)
+LLM_CACHE_FILE = "data/llm_cache.db"
+
+# Articles Gemini answered without a usable result are not retried for this long
+NEGATIVE_CACHE_TTL = 6 * 3600
+
+# Number of articles sent to Gemini in a single enhancement request
+ENHANCE_BATCH_SIZE = 8
+
+# Categories analyzed per insights request
+INSIGHTS_BATCH_SIZE = 30
+
+# Concurrent enhancement requests (GEMINI_CONCURRENCY)
+ENHANCE_CONCURRENCY = int(os.getenv('GEMINI_CONCURRENCY', '4'))
+
+# Client-side Gemini quota (requests and tokens per minute) and how long to
+# hold all requests back after the API answers 429
+GEMINI_RPM = int(os.getenv('GEMINI_RPM', '60'))
+GEMINI_TPM = int(os.getenv('GEMINI_TPM', '1000000'))
+RATE_LIMIT_COOLDOWN = 15.0
+
+# Retries for transient Gemini errors (429 / 5xx / timeouts): exponential
+# backoff with full jitter, or the server's retry hint when it sends one
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+# Seconds (about the P95 batch latency) after which a slow batch request is
+# duplicated and the first response wins; GEMINI_HEDGE_DELAY=0 disables hedging
+HEDGE_DELAY = float(os.getenv('GEMINI_HEDGE_DELAY', '20'))
+
+# Fixed task instructions are sent as the Gemini system instruction of one
+# model per task, so each request only carries the article-specific text
+SUMMARY_INSTRUCTIONS = """
+Summarize the Context Engineering / AI research article you are given in 2-3 concise sentences.
+Focus on the key innovation, practical implications, and relevance to prompt engineering, RAG, or LLM context management.
+Provide only the summary without any additional text."""
+
+KOREAN_INSTRUCTIONS = """
+Translate and summarize the AI/Context Engineering article you are given in Korean.
+
+Return a JSON object with:
+- "korean_title": Korean translation of the title
+- "korean_summary": 2-3 sentences summary in Korean, focusing on key innovations and practical implications
+- "korean_keywords": 3-5 Korean keywords
+
+IMPORTANT: 
+- Use natural, professional Korean
+- Focus on technical accuracy
+- Keep the summary concise but informative
+- Include practical implications for AI developers
+"""
+
+# Gemini emits JSON matching this schema directly for Korean translations
+KOREAN_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "korean_title": {"type": "string"},
+        "korean_summary": {"type": "string"},
+        "korean_keywords": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["korean_title", "korean_summary", "korean_keywords"]
+}
+
+BATCH_INSTRUCTIONS = """
+You will receive Context Engineering / AI research articles, each prefixed with its index.
+For EVERY article produce:
+- "ai_summary": 2-3 concise English sentences on the key innovation, practical implications, and relevance to prompt engineering, RAG, or LLM context management
+- "korean_title": natural, professional Korean translation of the title
+- "korean_summary": 2-3 sentence Korean summary focusing on key innovations and practical implications
+- "korean_keywords": 3-5 Korean keywords
+
+Respond with ONLY a JSON array, one object per article, in the same order, each including its "index".
+"""
+
+INSIGHTS_INSTRUCTIONS = """
+You will receive a JSON object {"tasks": [{"category": ..., "headlines": [...]}, ...]}.
+For EVERY category, analyze its news headlines and identify 2-3 key trends or insights.
+Respond with ONLY a JSON object {"insights": {"<category>": ["insight", ...], ...}} using the category values exactly as given.
+"""
+
+# Korean fields produced for each translated article
+KOREAN_FIELDS = ('korean_title', 'korean_summary', 'korean_keywords')
+
+# Per-request user messages (filled with str.format)
+BATCH_PROMPT_TMPL = """{count} articles:
+{articles}
+"""
+
+# One insight per bulleted ("•", "-", "*") or numbered line, for insights
+# returned as a text block instead of a list
+_BULLET_RE = re.compile(r'^\s*(?:[•\-*]|\d+[.)])\s*(.+?)\s*$', re.MULTILINE)
+
+
+def _build_prompt_body(title: str, description: str, content: str = "") -> str:
+    """Assemble the article text sent to Gemini (content truncated to 2000 chars)"""
+    if content:
+        return f"Title: {title}\n\nDescription: {description}\n\nContent: {content[:2000]}"
+    return f"Title: {title}\n\nDescription: {description}"
+
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    """Yield successive fixed-size chunks from a list"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _strip_code_fences(text: str) -> str:
+    """Remove markdown code fences Gemini sometimes wraps around JSON"""
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        if text.rstrip().endswith('```'):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def _build_batch_prompt(items: List[Dict]) -> str:
+    """User message for a batch enhancement request: each article prefixed with its index"""
+    articles = [
+        f"[{index}] " + _build_prompt_body(item['title'], item['description'], item.get('content', ''))
+        for index, item in enumerate(items)
+    ]
+    return BATCH_PROMPT_TMPL.format(count=len(items), articles='\n'.join(articles))
+
+
+def _parse_batch_response(text: str, count: int) -> List[Dict]:
+    """Per-article results from a batch response ({} for articles Gemini skipped)"""
+    parsed = json.loads(_strip_code_fences(text))
+    
+    results = [{} for _ in range(count)]
+    for position, entry in enumerate(parsed if isinstance(parsed, list) else []):
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get('index', position)
+        if not isinstance(index, int) or not 0 <= index < count:
+            continue
+        
+        result = {}
+        if entry.get('ai_summary'):
+            result['ai_summary'] = str(entry['ai_summary']).strip()
+        if entry.get('korean_title'):
+            result['korean_title'] = str(entry['korean_title']).strip()
+            result['korean_summary'] = str(entry.get('korean_summary', '')).strip()
+            keywords = entry.get('korean_keywords') or []
+            if isinstance(keywords, str):
+                keywords = keywords.split(',')
+            result['korean_keywords'] = [str(kw).strip() for kw in keywords if str(kw).strip()]
+        results[index] = result
+    
+    return results
+
+
+def _content_key(item: Dict) -> str:
+    """Enhancement cache key: identical article text reuses yesterday's result"""
+    text = '\n'.join((item.get('title', ''), item.get('description', ''), item.get('content', '')[:2000]))
+    return LLMCache.make_key(GEMINI_MODEL, 'enhance', text)
+
+
+def _checkpoint_header(data_file: str) -> Dict[str, str]:
+    """First line of a JSONL checkpoint, naming the data file it belongs to"""
+    return {'data_file': os.path.abspath(data_file)}
+
+
+def _load_checkpoint(path: str, data_file: str) -> Dict[str, Dict]:
+    """Read enhanced items back from a JSONL checkpoint, keyed by URL
+    
+    The first line records the data file the checkpoint was written for; a
+    checkpoint left behind by a run over a different file is deleted.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    
+    with open(path, 'rb') as f:
+        try:
+            stale = json.loads(f.readline()) != _checkpoint_header(data_file)
+        except ValueError:
+            stale = True
+        if not stale:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    # Torn final line from an interrupted run
+                    continue
+                done[item.get('url', '')] = item
+    
+    if stale:
+        logger.info(f"Discarding checkpoint {path} written for a different data file")
+        os.remove(path)
+    return done
+
+
+def _estimate_tokens(prompt: str, generation_config) -> int:
+    """Rough token cost of a request: ~4 characters per prompt token plus the output cap"""
+    return len(prompt) // 4 + (getattr(generation_config, 'max_output_tokens', None) or 0)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """True for Gemini 429 / RESOURCE_EXHAUSTED errors"""
+    return getattr(error, 'code', None) == 429 or 'ResourceExhausted' in type(error).__name__
+
+
+def _is_retryable(error: Exception) -> bool:
+    """True for rate limits, server-side failures and timeouts"""
+    if _is_rate_limited(error) or isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+        return True
+    return getattr(error, 'code', None) in (500, 502, 503, 504)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Server-provided retry delay in seconds (Retry-After header or RetryInfo), if any"""
+    response = getattr(error, 'response', None)
+    header = getattr(response, 'headers', {}).get('retry-after') if response is not None else None
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+    
+    for detail in getattr(error, 'details', None) or []:
+        delay = getattr(detail, 'retry_delay', None)
+        if delay is not None:
+            return getattr(delay, 'seconds', 0) + getattr(delay, 'nanos', 0) / 1e9
+    return None
+
+
+async def hedged(coro_factory: Callable[[], Awaitable], delay: float):
+    """Await coro_factory(); if it is still running after delay seconds, start a
+    second copy and return whichever succeeds first, cancelling the other"""
+    tasks = {asyncio.create_task(coro_factory())}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            tasks.add(asyncio.create_task(coro_factory()))
+        
+        while True:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            if not pending:
+                # Every attempt failed; surface the last error
+                return done.pop().result()
+            tasks = pending
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class RateLimiter:
+    """Request and token buckets refilled continuously at per-minute rates
+    
+    A request is dispatched only when both buckets have room for it, so we
+    stay just under the Gemini quota instead of sleeping blindly between calls.
+    """
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.available_request_capacity = float(requests_per_minute)
+        self.available_token_capacity = float(tokens_per_minute)
+        self._last_update = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _try_acquire(self, tokens: int) -> float:
+        """Take capacity for one request, or return how many seconds to wait first"""
+        # A single request larger than the whole token budget still goes through
+        tokens = min(tokens, self.tokens_per_minute)
+        
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            
+            elapsed = now - self._last_update
+            self._last_update = now
+            self.available_request_capacity = min(
+                self.requests_per_minute,
+                self.available_request_capacity + elapsed * self.requests_per_minute / 60
+            )
+            self.available_token_capacity = min(
+                self.tokens_per_minute,
+                self.available_token_capacity + elapsed * self.tokens_per_minute / 60
+            )
+            
+            if self.available_request_capacity >= 1 and self.available_token_capacity >= tokens:
+                self.available_request_capacity -= 1
+                self.available_token_capacity -= tokens
+                return 0.0
+            
+            request_wait = (1 - self.available_request_capacity) * 60 / self.requests_per_minute
+            token_wait = (tokens - self.available_token_capacity) * 60 / self.tokens_per_minute
+            return max(request_wait, token_wait, 0.001)
+    
+    async def acquire(self, tokens: int):
+        """Wait on the event loop until the request fits in both buckets"""
+        while (delay := self._try_acquire(tokens)) > 0:
+            await asyncio.sleep(delay)
+    
+    def acquire_blocking(self, tokens: int):
+        """Blocking variant of acquire() for synchronous callers"""
+        while (delay := self._try_acquire(tokens)) > 0:
+            time.sleep(delay)
+    
+    def penalize(self, cooldown: float = RATE_LIMIT_COOLDOWN):
+        """Hold every request back after a 429 and drain the request bucket"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + cooldown)
+            self.available_request_capacity = 0.0
+
+
 class AISummarizer:
-    def __init__(self):
+    def __init__(self, cache_ttl_days: float = 7, cache_path: str = LLM_CACHE_FILE):
         self.gemini_model = None
+        self._batch_fallback_model = None
+        self._cache = None
+        self._cache_ttl = cache_ttl_days * 24 * 3600
+        self._limiter = RateLimiter(GEMINI_RPM, GEMINI_TPM)
         
         # Initialize Gemini (our only AI service - free and powerful!)
-        if GEMINI_AVAILABLE and os.getenv('GEMINI_API_KEY'):
+        if GEMINI_AVAILABLE and GEMINI_API_KEY:
             try:
-                genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-                self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+                import google.generativeai as genai
+                genai.configure(api_key=GEMINI_API_KEY)
+                self.gemini_model = genai.GenerativeModel(GEMINI_MODEL)
+                self._summary_model = genai.GenerativeModel(GEMINI_MODEL, system_instruction=SUMMARY_INSTRUCTIONS)
+                self._korean_model = genai.GenerativeModel(GEMINI_MODEL, system_instruction=KOREAN_INSTRUCTIONS)
+                self._batch_model = genai.GenerativeModel(GEMINI_MODEL, system_instruction=BATCH_INSTRUCTIONS)
+                self._insights_model = genai.GenerativeModel(GEMINI_MODEL, system_instruction=INSIGHTS_INSTRUCTIONS)
+                if GEMINI_FALLBACK_MODEL:
+                    self._batch_fallback_model = genai.GenerativeModel(
+                        GEMINI_FALLBACK_MODEL, system_instruction=BATCH_INSTRUCTIONS
+                    )
+                
+                # Generation configs are reused across every request
+                self._summary_cfg = genai.types.GenerationConfig(max_output_tokens=150, temperature=0.3)
+                self._korean_cfg = genai.types.GenerationConfig(
+                    max_output_tokens=300, temperature=0.2,
+                    response_mime_type="application/json",
+                    response_schema=KOREAN_RESPONSE_SCHEMA
+                )
+                self._batch_cfg = genai.types.GenerationConfig(
+                    max_output_tokens=450 * ENHANCE_BATCH_SIZE, temperature=0.2,
+                    response_mime_type="application/json"
+                )
+                self._insights_cfg = genai.types.GenerationConfig(
+                    max_output_tokens=200 * INSIGHTS_BATCH_SIZE, temperature=0.4,
+                    response_mime_type="application/json"
+                )
                 logger.info("🚀 Gemini AI initialized successfully (FREE tier)")
             except Exception as e:
                 logger.warning(f"Failed to initialize Gemini: {e}")
-        elif not os.getenv('GEMINI_API_KEY'):
+            
+            if self.gemini_model and cache_ttl_days:
+                try:
+                    self._cache = LLMCache(cache_path)
+                except Exception as e:
+                    logger.warning(f"Response cache disabled: {e}")
+        elif not GEMINI_API_KEY:
             logger.info("💡 To enable AI features, set GEMINI_API_KEY environment variable")
     
     def is_available(self) -> bool:
         """Check if Gemini AI service is available"""
         return self.gemini_model is not None
     
+    def _cache_get(self, key: str) -> Optional[str]:
+        return self._cache.get(key) if self._cache else None
+    
+    def _cache_set(self, key: str, value: str, ttl: Optional[float] = None):
+        if self._cache:
+            self._cache.set(key, value, ttl or self._cache_ttl)
+    
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Delay before retry number attempt + 1; rate limits also hold back other requests"""
+        hint = _retry_after(error)
+        if _is_rate_limited(error):
+            self._limiter.penalize(hint if hint is not None else RATE_LIMIT_COOLDOWN)
+        if hint is not None:
+            return hint
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    
+    def _generate(self, model, prompt: str, generation_config, tokens: int) -> str:
+        """Blocking Gemini call with rate limiting and retries on transient errors"""
+        for attempt in range(MAX_ATTEMPTS):
+            self._limiter.acquire_blocking(tokens)
+            try:
+                return model.generate_content(prompt, generation_config=generation_config).text
+            except Exception as e:
+                if attempt == MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                logger.warning(f"Gemini request failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    async def _agenerate(self, model, prompt: str, generation_config, tokens: int) -> str:
+        """Async variant of _generate; slow requests are hedged after HEDGE_DELAY"""
+        async def request():
+            # Each copy (including a hedge) is charged against the quota
+            await self._limiter.acquire(tokens)
+            return await model.generate_content_async(prompt, generation_config=generation_config)
+        
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                if HEDGE_DELAY > 0:
+                    response = await hedged(request, HEDGE_DELAY)
+                else:
+                    response = await request()
+                return response.text
+            except Exception as e:
+                if attempt == MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                logger.warning(f"Gemini request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    async def _agenerate_with_fallback(self, model, fallback_model, prompt: str,
+                                       generation_config, tokens: int) -> str:
+        """_agenerate on model, bounded by PRIMARY_TIMEOUT; on timeout or failure the
+        request is sent once more to the cheaper fallback_model"""
+        if fallback_model is None:
+            return await self._agenerate(model, prompt, generation_config, tokens)
+        
+        try:
+            return await asyncio.wait_for(
+                self._agenerate(model, prompt, generation_config, tokens), PRIMARY_TIMEOUT
+            )
+        except Exception as e:
+            reason = f"no response after {PRIMARY_TIMEOUT:g}s" if isinstance(e, asyncio.TimeoutError) else e
+            logger.warning(f"{GEMINI_MODEL} failed ({reason}), falling back to {GEMINI_FALLBACK_MODEL}")
+            return await self._agenerate(fallback_model, prompt, generation_config, tokens)
+    
+    def _generate_cached(self, model, system: str, prompt: str, generation_config) -> str:
+        """Blocking Gemini call that reuses a cached response for an identical request"""
+        key = LLMCache.make_key(GEMINI_MODEL, system, prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        text = self._generate(model, prompt, generation_config,
+                              _estimate_tokens(system + prompt, generation_config))
+        self._cache_set(key, text)
+        return text
+    
     # We only use Gemini - it's free and powerful! 🚀
     
-    def summarize_with_gemini(self, title: str, description: str, content: str = "") -> Optional[str]:
-        """Generate summary using Google Gemini"""
+    def summarize_with_gemini(self, title: str = "", description: str = "", content: str = "",
+                              full_text: Optional[str] = None) -> Optional[str]:
+        """Generate summary using Google Gemini (full_text: prebuilt article body)"""
         if not self.gemini_model:
             return None
         
         try:
-            full_text = f"Title: {title}\n\nDescription: {description}"
-            if content:
-                full_text += f"\n\nContent: {content[:2000]}"
+            if full_text is None:
+                full_text = _build_prompt_body(title, description, content)
             
-            prompt = f"""
-Summarize this Context Engineering / AI research article in 2-3 concise sentences.
-Focus on the key innovation, practical implications, and relevance to prompt engineering, RAG, or LLM context management.
-
-{full_text}
-
-Provide only the summary without any additional text:"""
-            
-            response = self.gemini_model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=150,
-                    temperature=0.3,
-                )
-            )
-            
-            return response.text.strip()
+            return self._generate_cached(
+                self._summary_model, SUMMARY_INSTRUCTIONS, full_text, self._summary_cfg
+            ).strip()
             
         except Exception as e:
             logger.error(f"Gemini summarization failed: {e}")
             return None
     
-    def translate_and_summarize_korean(self, title: str, description: str, content: str = "") -> Optional[dict]:
-        """Generate Korean translation and summary using Google Gemini"""
+    def translate_and_summarize_korean(self, title: str = "", description: str = "", content: str = "",
+                                       full_text: Optional[str] = None) -> Optional[dict]:
+        """Generate Korean translation and summary using Google Gemini (full_text: prebuilt article body)"""
         if not self.gemini_model:
             return None
         
         try:
-            full_text = f"Title: {title}\n\nDescription: {description}"
-            if content:
-                full_text += f"\n\nContent: {content[:2000]}"
-            
-            prompt = f"""
-Please translate and summarize this AI/Context Engineering article in Korean.
-
-Provide the result in this EXACT format:
-
-**제목**: [Korean translation of title]
-
-**요약**: [2-3 sentences summary in Korean, focusing on key innovations and practical implications]
-
-**핵심 키워드**: [3-5 Korean keywords separated by commas]
-
-Article to translate and summarize:
-{full_text}
-
-IMPORTANT: 
-- Use natural, professional Korean
-- Focus on technical accuracy
-- Keep the summary concise but informative
-- Include practical implications for AI developers
-"""
-            
-            response = self.gemini_model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=300,
-                    temperature=0.2,
-                )
-            )
+            if full_text is None:
+                full_text = _build_prompt_body(title, description, content)
             
-            result_text = response.text.strip()
-            
-            # Parse the structured response
-            korean_data = self._parse_korean_response(result_text)
-            return korean_data
+            # The response schema guarantees the three Korean fields
+            return json.loads(self._generate_cached(
+                self._korean_model, KOREAN_INSTRUCTIONS, full_text, self._korean_cfg
+            ))
             
         except Exception as e:
             logger.error(f"Korean translation failed: {e}")
             return None
     
-    def _parse_korean_response(self, response_text: str) -> dict:
-        """Parse structured Korean response from Gemini"""
+    async def _batch_translate_and_summarize(self, items: List[Dict]) -> Optional[List[Dict]]:
+        """Generate English summaries and Korean translations for several articles in one call
+        
+        Returns one result dict per item ({} when Gemini skipped that article), or
+        None when the request itself failed.
+        """
+        if not self.gemini_model or not items:
+            return [{} for _ in items]
+        
+        prompt = _build_batch_prompt(items)
+        
         try:
-            lines = response_text.split('\n')
-            result = {
-                'korean_title': '',
-                'korean_summary': '',
-                'korean_keywords': []
-            }
-            
-            current_section = None
+            text = await self._agenerate_with_fallback(
+                self._batch_model, self._batch_fallback_model, prompt, self._batch_cfg,
+                _estimate_tokens(BATCH_INSTRUCTIONS + prompt, self._batch_cfg)
+            )
             
-            for line in lines:
-                line = line.strip()
-                if line.startswith('**제목**:'):
-                    result['korean_title'] = line.replace('**제목**:', '').strip()
-                elif line.startswith('**요약**:'):
-                    result['korean_summary'] = line.replace('**요약**:', '').strip()
-                    current_section = 'summary'
-                elif line.startswith('**핵심 키워드**:'):
-                    keywords_text = line.replace('**핵심 키워드**:', '').strip()
-                    result['korean_keywords'] = [kw.strip() for kw in keywords_text.split(',')]
-                    current_section = None
-                elif current_section == 'summary' and line and not line.startswith('**'):
-                    # Continue summary if it spans multiple lines
-                    result['korean_summary'] += ' ' + line
+            return _parse_batch_response(text, len(items))
             
-            # Clean up
-            result['korean_summary'] = result['korean_summary'].strip()
-            result['korean_keywords'] = [kw for kw in result['korean_keywords'] if kw]
+        except Exception as e:
+            logger.error(f"Gemini batch enhancement failed: {e}")
+            return None
+    
+    def translate_and_summarize_korean_batch(self, items: List[Dict]) -> List[Optional[Dict]]:
+        """Korean translation and summary for several articles in one Gemini request
+        
+        Returns, per item, a dict with the korean_* fields (None when that article
+        could not be translated). Results are shared with enhance_news_data's cache.
+        """
+        results: List[Optional[Dict]] = [None] * len(items)
+        if not self.gemini_model:
+            return results
+        
+        pending = []
+        for index, item in enumerate(items):
+            cached = self._cache_get(_content_key(item))
+            entry = json.loads(cached) if cached else {}
+            if entry.get('korean_title'):
+                results[index] = {field: entry[field] for field in KOREAN_FIELDS}
+            else:
+                pending.append(index)
+        
+        if not pending:
+            return results
+        
+        prompt = _build_batch_prompt([items[index] for index in pending])
+        try:
+            text = self._generate(
+                self._batch_model, prompt, self._batch_cfg,
+                _estimate_tokens(BATCH_INSTRUCTIONS + prompt, self._batch_cfg)
+            )
+            parsed = _parse_batch_response(text, len(pending))
+        except Exception as e:
+            logger.error(f"Korean batch translation failed: {e}")
+            return results
+        
+        for index, result in zip(pending, parsed):
+            if result.get('korean_title'):
+                self._cache_set(_content_key(items[index]), dumps_json(result).decode('utf-8'))
+                results[index] = {field: result[field] for field in KOREAN_FIELDS}
+        return results
+    
+    async def _throttled_batch(self, items: List[Dict], sem: asyncio.Semaphore):
+        """Run one enhancement batch once a concurrency slot is free"""
+        async with sem:
+            return items, await self._batch_translate_and_summarize(items)
+    
+    async def _enhance_candidates(self, candidates: List[Dict], checkpoint):
+        """Enhance candidate items concurrently, recording each batch as it finishes"""
+        sem = asyncio.Semaphore(ENHANCE_CONCURRENCY)
+        tasks = [
+            self._throttled_batch(batch, sem)
+            for batch in _chunks(candidates, ENHANCE_BATCH_SIZE)
+        ]
+        processed = 0
+        
+        for next_done in asyncio.as_completed(tasks):
+            batch, results = await next_done
+            processed += len(batch)
+            if results is None:
+                # Failed requests are not cached; these items are retried next run
+                continue
             
-            return result
+            for item, result in zip(batch, results):
+                if result:
+                    item.update(result)
+                    self._cache_set(_content_key(item), dumps_json(result).decode('utf-8'))
+                    checkpoint.write(dumps_json(item) + b'\n')
+                else:
+                    # Negative entry: skip this article for a while instead of every run
+                    self._cache_set(_content_key(item), '{}', NEGATIVE_CACHE_TTL)
+            checkpoint.flush()
             
-        except Exception as e:
-            logger.warning(f"Failed to parse Korean response: {e}")
-            return {
-                'korean_title': '',
-                'korean_summary': response_text[:200] + '...' if len(response_text) > 200 else response_text,
-                'korean_keywords': []
-            }
+            translated = sum(1 for result in results if result.get('korean_title'))
+            logger.info(f"Enhanced items {processed}/{len(candidates)} "
+                        f"({translated}/{len(batch)} with Korean translation)")
     
     def generate_summary(self, title: str, description: str, content: str = "") -> Optional[str]:
         """Generate summary using Gemini AI (free and powerful!)"""
@@ -173,55 +640,38 @@ IMPORTANT:
             return {}
         
         # Group items by category
-        categories = {}
+        categories = defaultdict(list)
         for item in items:
-            category = item.get('category', 'general')
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(item)
+            categories[item.get('category', 'general')].append(item)
         
+        # Skip categories with too few items
+        eligible = [category for category, cat_items in categories.items() if len(cat_items) >= 3]
         insights = {}
         
-        for category, cat_items in categories.items():
-            if len(cat_items) < 3:  # Skip categories with too few items
-                continue
-            
-            # Create a summary of the category
-            titles = [item['title'] for item in cat_items[:5]]
-            category_text = "\n".join(titles)
+        # One request covers many categories; results come back keyed by category
+        for chunk in _chunks(eligible, INSIGHTS_BATCH_SIZE):
+            tasks = [
+                {"category": category, "headlines": [item['title'] for item in categories[category][:5]]}
+                for category in chunk
+            ]
+            prompt = dumps_json({"tasks": tasks}).decode('utf-8')
             
             try:
-                # Only use Gemini for insights (free and effective!)
-                if self.gemini_model:
-                    prompt = f"""
-Analyze these {category.replace('_', ' ')} news headlines and identify 2-3 key trends or insights:
-
-{category_text}
-
-Key insights (as bullet points):"""
-                    
-                    response = self.gemini_model.generate_content(
-                        prompt,
-                        generation_config=genai.types.GenerationConfig(
-                            max_output_tokens=200,
-                            temperature=0.4,
-                        )
-                    )
-                    
-                    insight_text = response.text.strip()
-                    
-                    # Parse bullet points
-                    insights[category] = [
-                        line.strip().lstrip('•-*').strip() 
-                        for line in insight_text.split('\n') 
-                        if line.strip() and not line.strip().startswith('Key insights')
-                    ][:3]
-                    
-                    time.sleep(0.5)  # Gentle rate limiting for free tier
-                    
+                insight_text = self._generate_cached(
+                    self._insights_model, INSIGHTS_INSTRUCTIONS, prompt, self._insights_cfg
+                )
+                parsed = json.loads(_strip_code_fences(insight_text)).get('insights') or {}
+                
             except Exception as e:
-                logger.error(f"Failed to extract insights for {category}: {e}")
+                logger.error(f"Failed to extract insights for {', '.join(chunk)}: {e}")
                 continue
+            
+            for category in chunk:
+                bullets = parsed.get(category)
+                if isinstance(bullets, str):
+                    bullets = _BULLET_RE.findall(bullets)
+                if bullets:
+                    insights[category] = [str(bullet).strip() for bullet in bullets][:3]
         
         return insights
     
@@ -233,58 +683,64 @@ Key insights (as bullet points):"""
             return {}
         
         # Load existing data
-        with open(data_file, 'r', encoding='utf-8') as f:
-            news_data = json.load(f)
+        news_data = load_json(data_file)
         
-        items = news_data['items']
-        enhanced_items = []
+        # Items are enhanced in place; news_data is private to this call
+        enhanced_items = news_data['items']
         
-        logger.info(f"Enhancing {len(items)} news items with AI summaries...")
+        logger.info(f"Enhancing {len(enhanced_items)} news items with AI summaries...")
         
-        for i, item in enumerate(items):
-            enhanced_item = item.copy()
-            
-            # Generate AI summary and Korean translation for high-quality items
-            if item.get('score', 0) >= 0.4:
-                # English summary
-                summary = self.generate_summary(
-                    item['title'], 
-                    item['description'], 
-                    item.get('content', '')
-                )
-                
-                if summary:
-                    enhanced_item['ai_summary'] = summary
-                
-                # Korean translation and summary
-                korean_data = self.translate_and_summarize_korean(
-                    item['title'],
-                    item['description'],
-                    item.get('content', '')
-                )
-                
-                if korean_data:
-                    enhanced_item.update(korean_data)
-                    logger.info(f"Generated Korean translation for item {i+1}/{len(items)}")
-                else:
-                    logger.info(f"Generated English summary for item {i+1}/{len(items)}")
-                
-                time.sleep(0.8)  # Slightly longer delay for translation
-            
-            enhanced_items.append(enhanced_item)
+        # Generate AI summary and Korean translation for high-quality items,
+        # several articles per Gemini request with a few requests in flight
+        # on one event loop.
+        # Finished items are appended to a JSONL checkpoint so an interrupted
+        # run resumes without paying for the same Gemini calls again.
+        # Results are also kept in the persistent response cache keyed by
+        # content, so articles seen in earlier runs skip Gemini entirely.
+        checkpoint_file = os.path.splitext(output_file)[0] + '.jsonl'
+        done = _load_checkpoint(checkpoint_file, data_file)
+        
+        candidates = []
+        cached = skipped = 0
+        for item in enhanced_items:
+            if item.get('score', 0) < 0.4:
+                continue
+            previous = done.get(item.get('url', ''))
+            if previous:
+                item.update(previous)
+                continue
+            result = self._cache_get(_content_key(item))
+            if result == '{}':
+                skipped += 1
+            elif result is not None:
+                item.update(json.loads(result))
+                cached += 1
+            else:
+                candidates.append(item)
+        
+        if done:
+            logger.info(f"Resuming from checkpoint: {len(done)} items already enhanced")
+        if cached:
+            logger.info(f"Reused cached enhancement for {cached} items")
+        if skipped:
+            logger.info(f"Skipped {skipped} items Gemini recently returned nothing for")
+        
+        with open(checkpoint_file, 'ab') as checkpoint:
+            if checkpoint.tell() == 0:
+                checkpoint.write(dumps_json(_checkpoint_header(data_file)) + b'\n')
+            asyncio.run(self._enhance_candidates(candidates, checkpoint))
         
         # Extract key insights
         insights = self.extract_key_insights(enhanced_items)
         
         # Create enhanced data structure
-        enhanced_data = news_data.copy()
-        enhanced_data['items'] = enhanced_items
+        enhanced_data = news_data
         enhanced_data['ai_insights'] = insights
         enhanced_data['enhanced_at'] = datetime.now().isoformat()
         
-        # Save enhanced data
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(enhanced_data, f, indent=2, ensure_ascii=False)
+        # Save enhanced data (compact; run_daily_news.py --pretty reformats it)
+        dump_json(enhanced_data, output_file, pretty=False)
+        os.remove(checkpoint_file)
         
         logger.info(f"Enhanced news data saved to {output_file}")
         return enhanced_data
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Filesystem helpers for Context Engineering news output files
+"""
+
+import os
+import shutil
+
+
+def link_or_copy(src: str, dst: str):
+    """Replace dst with a hard link to src, or a copy when they are on different filesystems"""
+    try:
+        os.remove(dst)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
@@ -3,19 +3,36 @@
 HTML Newsletter Generator for Context Engineering Daily
 """
 
-import json
+import os
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from collections import Counter
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateNotFound
 import logging
 
+try:
+    from .json_utils import load_config, load_json
+except ImportError:
+    from json_utils import load_config, load_json
+
+# pandas aggregates large archives in C; small daily files are faster in plain Python
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Compiled template bytecode is kept here between runs
+TEMPLATE_CACHE_DIR = ".jinja_cache"
+
+# Item count from which keyword and stats aggregation switches to pandas
+PANDAS_MIN_ITEMS = 5000
+
 class NewsletterGenerator:
     def __init__(self, config_path: str = "config"):
-        with open(f"{config_path}/categories.json", 'r') as f:
-            self.categories_config = json.load(f)
+        self.categories_config = load_config(f"{config_path}/categories.json")
         
         # Category icons mapping
         self.category_icons = {
@@ -29,11 +46,38 @@ class NewsletterGenerator:
             "research_papers": "📜",
             "industry_news": "🏢"
         }
+        
+        # Templates are parsed once per process (and their bytecode cached on
+        # disk), through one Environment per template directory
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        self._bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+        self._envs: Dict[str, Environment] = {}
+    
+    def _environment(self, directory: str) -> Environment:
+        """Environment loading templates from directory"""
+        env = self._envs.get(directory)
+        if env is None:
+            env = self._envs[directory] = Environment(
+                loader=FileSystemLoader(directory),
+                bytecode_cache=self._bytecode_cache
+            )
+        return env
+    
+    def _load_template(self, template_path: str):
+        template_path = os.path.abspath(template_path)
+        return self._environment(os.path.dirname(template_path)).get_template(os.path.basename(template_path))
+    
+    def get_template(self, template_file: str):
+        """Load a compiled template, falling back to simple_newsletter.html"""
+        try:
+            return self._load_template(template_file)
+        except TemplateNotFound:
+            logger.warning(f"Template file {template_file} not found, trying simple_newsletter.html")
+            return self._load_template("templates/simple_newsletter.html")
     
     def load_news_data(self, data_file: str = "data/daily_news.json") -> Dict[str, Any]:
         """Load news data from JSON file"""
-        with open(data_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_json(data_file)
     
     def format_date(self, date_string: str) -> str:
         """Format date string for display"""
@@ -45,19 +89,28 @@ class NewsletterGenerator:
     
     def get_trending_keywords(self, items: List[Dict]) -> List[str]:
         """Extract trending keywords from all items"""
-        all_keywords = []
+        if PANDAS_AVAILABLE and len(items) >= PANDAS_MIN_ITEMS:
+            keywords = pd.DataFrame(items, columns=['keywords'])['keywords'].explode().dropna()
+            # Stable sort keeps first-seen order among ties, like Counter.most_common
+            counts = keywords.value_counts(sort=False).sort_values(ascending=False, kind='stable')
+            return counts.head(10).index.tolist()
+        
+        # Count keywords without building an intermediate list
+        keyword_counts = Counter()
         for item in items:
-            all_keywords.extend(item.get('keywords', []))
+            keyword_counts.update(item.get('keywords', ()))
         
-        # Count and return top keywords
-        keyword_counts = Counter(all_keywords)
         return [kw for kw, count in keyword_counts.most_common(10)]
     
-    def organize_by_category(self, items: List[Dict]) -> Dict[str, Dict]:
-        """Organize news items by category"""
+    def organize_by_category(self, items: List[Dict],
+                             keyword_counts: Optional[Counter] = None) -> Dict[str, Dict]:
+        """Organize news items by category (optionally tallying keywords into keyword_counts)"""
         categories = {}
         
         for item in items:
+            if keyword_counts is not None:
+                keyword_counts.update(item.get('keywords', []))
+            
             category_id = item.get('category', 'industry_news')
             
             if category_id not in categories:
@@ -99,29 +152,24 @@ class NewsletterGenerator:
     
     def generate_html(self, data_file: str = "data/daily_news.json", 
                      template_file: str = "templates/simple_newsletter.html",
-                     output_file: str = "docs/index.html") -> str:
-        """Generate HTML newsletter"""
+                     output_file: str = "docs/index.html",
+                     news_data: Optional[Dict] = None) -> str:
+        """Generate HTML newsletter (from news_data when given, else loaded from data_file)"""
         # Load data
-        news_data = self.load_news_data(data_file)
+        if news_data is None:
+            news_data = self.load_news_data(data_file)
         items = news_data['items']
         
-        # Organize data
-        categories = self.organize_by_category(items)
-        trending_keywords = self.get_trending_keywords(items)
+        # Organize data, counting keywords in the same pass
+        keyword_counts = Counter()
+        categories = self.organize_by_category(items, keyword_counts)
+        trending_keywords = [kw for kw, count in keyword_counts.most_common(10)]
         
         # Get unique sources
         sources = list(set(item['source'] for item in items))
         
         # Load template with fallback
-        try:
-            with open(template_file, 'r', encoding='utf-8') as f:
-                template_content = f.read()
-        except FileNotFoundError:
-            logger.warning(f"Template file {template_file} not found, trying simple_newsletter.html")
-            with open("templates/simple_newsletter.html", 'r', encoding='utf-8') as f:
-                template_content = f.read()
-        
-        template = Template(template_content)
+        template = self.get_template(template_file)
         
         # Template data
         template_data = {
@@ -144,21 +192,30 @@ class NewsletterGenerator:
         logger.info(f"Generated HTML newsletter: {output_file}")
         return html_content
     
-    def generate_summary_stats(self, data_file: str = "data/daily_news.json") -> Dict:
-        """Generate summary statistics"""
-        news_data = self.load_news_data(data_file)
+    def generate_summary_stats(self, data_file: str = "data/daily_news.json",
+                               news_data: Optional[Dict] = None) -> Dict:
+        """Generate summary statistics (from news_data when given, else loaded from data_file)"""
+        if news_data is None:
+            news_data = self.load_news_data(data_file)
         items = news_data['items']
         
-        # Category distribution
-        category_dist = Counter(item.get('category', 'unknown') for item in items)
+        if PANDAS_AVAILABLE and len(items) >= PANDAS_MIN_ITEMS:
+            return self._summary_stats_pandas(news_data)
         
-        # Source distribution
-        source_dist = Counter(item['source'] for item in items)
-        
-        # Score distribution
-        high_quality = len([item for item in items if item.get('score', 0) >= 0.7])
-        medium_quality = len([item for item in items if 0.4 <= item.get('score', 0) < 0.7])
-        low_quality = len([item for item in items if item.get('score', 0) < 0.4])
+        # Category, source and score distributions in a single pass
+        category_dist = Counter()
+        source_dist = Counter()
+        high_quality = medium_quality = low_quality = 0
+        for item in items:
+            category_dist[item.get('category', 'unknown')] += 1
+            source_dist[item['source']] += 1
+            score = item.get('score', 0)
+            if score >= 0.7:
+                high_quality += 1
+            elif score >= 0.4:
+                medium_quality += 1
+            else:
+                low_quality += 1
         
         return {
             'total_items': len(items),
@@ -172,6 +229,25 @@ class NewsletterGenerator:
             }
         }
 
+    def _summary_stats_pandas(self, news_data: Dict) -> Dict:
+        """generate_summary_stats for large archives, aggregated with pandas"""
+        df = pd.DataFrame(news_data['items'], columns=['category', 'source', 'score'])
+        scores = df['score'].fillna(0)
+        quality = pd.cut(scores, bins=[float('-inf'), 0.4, 0.7, float('inf')],
+                         labels=['low', 'medium', 'high'], right=False).value_counts()
+        
+        return {
+            'total_items': len(df),
+            'generation_time': news_data.get('generated_at'),
+            'category_distribution': df['category'].fillna('unknown').value_counts(sort=False).to_dict(),
+            'source_distribution': df['source'].value_counts(sort=False).to_dict(),
+            'quality_distribution': {
+                'high': int(quality['high']),
+                'medium': int(quality['medium']),
+                'low': int(quality['low'])
+            }
+        }
+
 def main():
     """Main function to generate newsletter"""
     generator = NewsletterGenerator()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Fast JSON helpers for Context Engineering news data files
+"""
+
+from functools import lru_cache
+from typing import Any
+
+# orjson is a C-accelerated drop-in for the news corpus; fall back to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+# Coalesce writes of large data files into 256KB chunks
+WRITE_BUFFER_SIZE = 256 * 1024
+
+
+def load_json(path: str) -> Any:
+    """Load a JSON document from disk"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str) -> Any:
+    """Load a configuration file, parsed once per process (treat the result as read-only)"""
+    return load_json(path)
+
+
+def dumps_json(data: Any) -> bytes:
+    """Serialize a JSON value to compact UTF-8 bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def dump_json(data: Any, path: str, pretty: bool = True):
+    """Write a JSON document to disk (UTF-8, 2-space indent unless pretty=False)"""
+    if pretty:
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    else:
+        payload = dumps_json(data)
+
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(payload)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Persistent prompt cache for Gemini responses
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class LLMCache:
+    """SQLite-backed response cache keyed by a SHA-256 of (model, system, user)"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        # Autocommit connection shared by the event loop and worker threads
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS llm_cache ('
+            'hash TEXT PRIMARY KEY, response TEXT NOT NULL, '
+            'created_at INTEGER NOT NULL, expires_at INTEGER)'
+        )
+
+    @staticmethod
+    def make_key(model: str, system: str, user: str) -> str:
+        """Cache key for one request"""
+        return hashlib.sha256(f"{model}|{system}|{user}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT response, expires_at FROM llm_cache WHERE hash = ?', (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        response, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return response
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        """Store a response, expiring after ttl seconds (never when None)"""
+        now = int(time.time())
+        expires_at = now + int(ttl) if ttl else None
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (hash, response, created_at, expires_at) '
+                'VALUES (?, ?, ?, ?)',
+                (key, value, now, expires_at)
+            )
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at < ?',
+                (int(time.time()),)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
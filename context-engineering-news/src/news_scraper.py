@@ -4,24 +4,64 @@ Context Engineering Daily News Scraper
 Collects news from various sources and categorizes them.
 """
 
-import json
 import os
 import requests
 import feedparser
 import re
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 from dataclasses import dataclass
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import logging
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
 
+try:
+    from .json_utils import dump_json, load_config, load_json
+except ImportError:
+    from json_utils import dump_json, load_config, load_json
+
+# Aho-Corasick finds every keyword in one pass over the text; without it we
+# fall back to one substring check per distinct keyword
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Feeds are fetched concurrently; at most PER_HOST_CONCURRENCY requests per host
+SCRAPE_MAX_WORKERS = 8
+PER_HOST_CONCURRENCY = 4
+REQUEST_TIMEOUT = 20
+
+# Keep-alive connection pool shared by every scraper; transient gateway errors
+# are retried with exponential backoff (0.5s, 1s, 2s)
+HTTP_POOL_SIZE = 20
+HTTP_RETRIES = 3
+HTTP_RETRY_BACKOFF = 0.5
+HTTP_RETRY_STATUSES = (502, 503, 504)
+
+# GitHub search queries run in parallel; when the remaining quota drops below
+# GITHUB_RATE_LIMIT_FLOOR we wait (at most GITHUB_MAX_RESET_WAIT seconds) for the reset
+GITHUB_CONCURRENCY = 2
+GITHUB_RATE_LIMIT_FLOOR = 5
+GITHUB_MAX_RESET_WAIT = 60
+
+# Conditional GET: ETag/Last-Modified per feed URL, with the last body kept on
+# disk so an HTTP 304 can be parsed without downloading the feed again
+FEED_CACHE_FILE = "data/feed_cache.json"
+FEED_CACHE_DIR = "data/feed_cache"
+
+@dataclass(slots=True)
 class NewsItem:
     title: str
     url: str
@@ -32,13 +72,37 @@ class NewsItem:
     keywords: List[str]
     score: float = 0.0
     content: str = ""
+    text_lower: str = ""  # lowercased "title description" used for categorization
 
 class NewsScraperConfig:
     def __init__(self, config_path: str = "config"):
-        with open(f"{config_path}/sources.json", 'r') as f:
-            self.sources = json.load(f)
-        with open(f"{config_path}/categories.json", 'r') as f:
-            self.categories = json.load(f)
+        self.sources = load_config(f"{config_path}/sources.json")
+        self.categories = load_config(f"{config_path}/categories.json")
+        self._build_keyword_index()
+    
+    def _build_keyword_index(self):
+        """Precompute lowercase keyword lookups used by categorize_content"""
+        # lowercase keyword -> [(category, keyword as configured), ...]
+        self.category_keyword_index = {}
+        for cat_id, cat_info in self.categories['categories'].items():
+            for keyword in cat_info['keywords']:
+                self.category_keyword_index.setdefault(keyword.lower(), []).append((cat_id, keyword))
+        
+        self.priority_keywords = [(kw.lower(), kw) for kw in self.categories['priority_keywords']]
+        
+        self._all_keywords = set(self.category_keyword_index) | {kw for kw, _ in self.priority_keywords}
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE and self._all_keywords:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._all_keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+    
+    def match_keywords(self, text: str) -> Set[str]:
+        """Return the distinct lowercase keywords occurring in already-lowercased text"""
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+        return {keyword for keyword in self._all_keywords if keyword in text}
     
     def get_category_keywords(self) -> Dict[str, List[str]]:
         return {cat_id: cat_info['keywords'] 
@@ -51,32 +115,125 @@ class ContextEngineeringNewsScraper:
         self.session.headers.update({
             'User-Agent': 'Context-Engineering-News-Bot/1.0 (Educational Purpose)'
         })
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=Retry(total=HTTP_RETRIES, backoff_factor=HTTP_RETRY_BACKOFF,
+                              status_forcelist=HTTP_RETRY_STATUSES)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._host_limits = {}
+        self._host_limits_lock = threading.Lock()
+        self._github_lock = threading.Lock()
+        self._github_reset_at = 0.0
+        self._feed_cache = self._load_feed_cache()
+        self._feed_cache_lock = threading.Lock()
     
-    def categorize_content(self, title: str, description: str) -> tuple[str, float, List[str]]:
-        """Categorize content and return category, confidence score, and matched keywords"""
-        text = f"{title} {description}".lower()
-        category_scores = {}
+    def _host_semaphore(self, url: str) -> threading.Semaphore:
+        """Per-host semaphore that keeps concurrent requests to one site polite"""
+        host = urlparse(url).netloc
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.Semaphore(PER_HOST_CONCURRENCY)
+            return self._host_limits[host]
+    
+    @staticmethod
+    def _load_feed_cache() -> Dict[str, Dict[str, str]]:
+        """Load the ETag/Last-Modified validators saved by the previous run"""
+        try:
+            return load_json(FEED_CACHE_FILE)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def save_feed_cache(self):
+        """Persist the feed validators for the next run"""
+        os.makedirs(os.path.dirname(FEED_CACHE_FILE), exist_ok=True)
+        with self._feed_cache_lock:
+            dump_json(self._feed_cache, FEED_CACHE_FILE)
+    
+    @staticmethod
+    def _feed_body_path(url: str) -> str:
+        return os.path.join(FEED_CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.xml')
+    
+    def _fetch_feed(self, url: str):
+        """Download a feed through the shared session and parse it with feedparser
+        
+        Sends If-None-Match/If-Modified-Since when a cached copy exists; on HTTP 304
+        the cached body is parsed instead.
+        """
+        body_path = self._feed_body_path(url)
+        validators = self._feed_cache.get(url, {})
+        headers = {}
+        if os.path.exists(body_path):
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('modified'):
+                headers['If-Modified-Since'] = validators['modified']
+        
+        with self._host_semaphore(url):
+            response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        
+        if response.status_code == 304:
+            with open(body_path, 'rb') as f:
+                return feedparser.parse(f.read())
+        
+        response.raise_for_status()
+        etag = response.headers.get('ETag')
+        modified = response.headers.get('Last-Modified')
+        if etag or modified:
+            os.makedirs(FEED_CACHE_DIR, exist_ok=True)
+            with open(body_path, 'wb') as f:
+                f.write(response.content)
+            with self._feed_cache_lock:
+                self._feed_cache[url] = {'etag': etag, 'modified': modified}
+        
+        return feedparser.parse(response.content)
+    
+    def _github_search(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """Run one GitHub API request, honoring the X-RateLimit-* response headers"""
+        with self._github_lock:
+            wait = self._github_reset_at - time.time()
+        if wait > 0:
+            logger.info(f"GitHub rate limit nearly exhausted, waiting {min(wait, GITHUB_MAX_RESET_WAIT):.0f}s")
+            time.sleep(min(wait, GITHUB_MAX_RESET_WAIT))
+        
+        with self._host_semaphore(url):
+            response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is not None and reset is not None and int(remaining) < GITHUB_RATE_LIMIT_FLOOR:
+            with self._github_lock:
+                self._github_reset_at = max(self._github_reset_at, float(reset))
+        return response
+    
+    def categorize_content(self, title: str, description: str,
+                           text_lower: Optional[str] = None) -> tuple[str, float, List[str]]:
+        """Categorize content and return category, confidence score, and matched keywords
+        
+        Callers that already hold the lowercased "title description" text can pass it
+        as text_lower to skip rebuilding it.
+        """
+        if text_lower is None:
+            text_lower = f"{title} {description}".lower()
+        found = self.config.match_keywords(text_lower)
+        
+        # Each category scores 1 per matching keyword of its own
+        category_scores = dict.fromkeys(self.config.categories['categories'], 0)
         matched_keywords = []
+        for keyword in found:
+            for cat_id, original in self.config.category_keyword_index.get(keyword, ()):
+                category_scores[cat_id] += 1
+                matched_keywords.append(original)
         
-        # Check each category
-        for cat_id, cat_info in self.config.categories['categories'].items():
-            score = 0
-            cat_keywords = []
-            
-            for keyword in cat_info['keywords']:
-                if keyword.lower() in text:
-                    score += 1
-                    cat_keywords.append(keyword)
-            
-            # Boost score for priority keywords
-            for priority_kw in self.config.categories['priority_keywords']:
-                if priority_kw.lower() in text:
-                    score += 2
-                    cat_keywords.append(priority_kw)
-            
-            category_scores[cat_id] = score
-            if score > 0:
-                matched_keywords.extend(cat_keywords)
+        # Priority keywords boost every category by 2 each
+        priority_matches = [original for keyword, original in self.config.priority_keywords if keyword in found]
+        if priority_matches:
+            boost = 2 * len(priority_matches)
+            for cat_id in category_scores:
+                category_scores[cat_id] += boost
+            matched_keywords.extend(priority_matches)
         
         # Find best category
         best_category = max(category_scores.items(), key=lambda x: x[1])
@@ -93,17 +250,19 @@ class ContextEngineeringNewsScraper:
         items = []
         
         try:
-            feed = feedparser.parse(url)
+            feed = self._fetch_feed(url)
+            cutoff = datetime.now(timezone.utc) - timedelta(days=7)
             for entry in feed.entries[:10]:  # Latest 10 papers
-                # Parse arxiv date format
-                pub_date = datetime(*entry.published_parsed[:6])
+                # Parse arxiv date format (feedparser normalizes to UTC)
+                pub_date = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
                 
                 # Skip if older than 7 days
-                if pub_date < datetime.now() - timedelta(days=7):
+                if pub_date < cutoff:
                     continue
                 
+                text_lower = f"{entry.title} {entry.summary}".lower()
                 category, score, keywords = self.categorize_content(
-                    entry.title, entry.summary
+                    entry.title, entry.summary, text_lower
                 )
                 
                 # Only include if relevant to context engineering
@@ -119,7 +278,8 @@ class ContextEngineeringNewsScraper:
                     category=category,
                     keywords=keywords,
                     score=score,
-                    content=entry.summary
+                    content=entry.summary,
+                    text_lower=text_lower
                 )
                 items.append(item)
                 
@@ -134,21 +294,24 @@ class ContextEngineeringNewsScraper:
         items = []
         
         try:
-            feed = feedparser.parse(url)
+            feed = self._fetch_feed(url)
+            now = datetime.now(timezone.utc)
+            cutoff = now - timedelta(days=3)
             for entry in feed.entries[:15]:  # Latest 15 items
-                # Parse date
+                # Parse date (feedparser normalizes to UTC)
                 if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    pub_date = datetime(*entry.published_parsed[:6])
+                    pub_date = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
                 else:
-                    pub_date = datetime.now()
+                    pub_date = now
                 
                 # Skip if older than 3 days for blogs
-                if pub_date < datetime.now() - timedelta(days=3):
+                if pub_date < cutoff:
                     continue
                 
                 description = getattr(entry, 'summary', getattr(entry, 'description', ''))
+                text_lower = f"{entry.title} {description}".lower()
                 category, score, keywords = self.categorize_content(
-                    entry.title, description
+                    entry.title, description, text_lower
                 )
                 
                 # Only include if relevant
@@ -163,7 +326,8 @@ class ContextEngineeringNewsScraper:
                     source=source_name,
                     category=category,
                     keywords=keywords,
-                    score=score
+                    score=score,
+                    text_lower=text_lower
                 )
                 items.append(item)
                 
@@ -177,12 +341,12 @@ class ContextEngineeringNewsScraper:
         logger.info("Scraping GitHub trending repositories")
         items = []
         
-        # Add GitHub token if available for higher rate limits
+        # Add GitHub token if available for higher rate limits (per request, so
+        # feeds fetched concurrently on the same session never receive it)
+        headers = {'Accept': 'application/vnd.github+json'}
         github_token = os.getenv('GITHUB_TOKEN')
         if github_token:
-            self.session.headers.update({
-                'Authorization': f'token {github_token}'
-            })
+            headers['Authorization'] = f'token {github_token}'
         
         try:
             # Use GitHub API to search for relevant repositories
@@ -193,17 +357,22 @@ class ContextEngineeringNewsScraper:
                 "chain-of-thought+language:python+created:>2024-01-01"
             ]
             
-            for query in queries:
-                url = f"https://api.github.com/search/repositories?q={query}&sort=stars&order=desc"
-                
-                response = self.session.get(url)
+            urls = [
+                f"https://api.github.com/search/repositories?q={query}&sort=stars&order=desc"
+                for query in queries
+            ]
+            with ThreadPoolExecutor(max_workers=GITHUB_CONCURRENCY) as pool:
+                responses = list(pool.map(lambda url: self._github_search(url, headers), urls))
+            
+            for response in responses:
                 if response.status_code == 200:
                     data = response.json()
                     
                     for repo in data.get('items', [])[:5]:  # Top 5 per query
+                        title = repo['name'] + " " + repo['description'] if repo['description'] else repo['name']
+                        text_lower = f"{title} {repo['description'] or ''}".lower()
                         category, score, keywords = self.categorize_content(
-                            repo['name'] + " " + repo['description'] if repo['description'] else repo['name'],
-                            repo['description'] or ""
+                            title, repo['description'] or "", text_lower
                         )
                         
                         if score < 0.3:
@@ -224,12 +393,11 @@ class ContextEngineeringNewsScraper:
                             source="GitHub",
                             category=category,
                             keywords=keywords,
-                            score=score
+                            score=score,
+                            text_lower=text_lower
                         )
                         items.append(item)
                 
-                time.sleep(1)  # Rate limiting
-                
         except Exception as e:
             logger.error(f"Error scraping GitHub: {e}")
         
@@ -237,48 +405,44 @@ class ContextEngineeringNewsScraper:
     
     def scrape_all_sources(self) -> List[NewsItem]:
         """Scrape all configured sources"""
-        all_items = []
+        # URL -> item; on duplicate URLs the higher-scoring item wins
+        by_url: Dict[str, NewsItem] = {}
         
-        for source_id, source_info in self.config.sources['sources'].items():
-            logger.info(f"Processing source: {source_info['name']}")
-            
-            try:
+        # Every feed (and the GitHub search) is fetched concurrently; results are
+        # collected in configuration order so duplicate handling stays stable
+        with ThreadPoolExecutor(max_workers=SCRAPE_MAX_WORKERS) as pool:
+            jobs = []
+            for source_id, source_info in self.config.sources['sources'].items():
+                logger.info(f"Processing source: {source_info['name']}")
+                
                 if source_info['type'] == 'rss':
                     for url in source_info['urls']:
                         if 'arxiv' in url:
-                            items = self.scrape_arxiv(url)
+                            jobs.append((source_id, pool.submit(self.scrape_arxiv, url)))
                         else:
-                            items = self.scrape_rss(url, source_info['name'])
-                        all_items.extend(items)
-                        time.sleep(2)  # Rate limiting
+                            jobs.append((source_id, pool.submit(self.scrape_rss, url, source_info['name'])))
                 
                 elif source_info['type'] == 'github_api':
-                    items = self.scrape_github_trending()
-                    all_items.extend(items)
+                    jobs.append((source_id, pool.submit(self.scrape_github_trending)))
                 
                 # Add more source types as needed
+            
+            for source_id, future in jobs:
+                try:
+                    items = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing source {source_id}: {e}")
+                    continue
                 
-            except Exception as e:
-                logger.error(f"Error processing source {source_id}: {e}")
-                continue
-        
-        # Remove duplicates based on URL
-        seen_urls = set()
-        unique_items = []
-        for item in all_items:
-            if item.url not in seen_urls:
-                seen_urls.add(item.url)
-                unique_items.append(item)
+                for item in items:
+                    previous = by_url.get(item.url)
+                    if previous is None or item.score > previous.score:
+                        by_url[item.url] = item
         
-        # Sort by score and date (handle timezone-aware vs naive datetimes)
-        def sort_key(item):
-            date = item.published_date
-            if date.tzinfo is None:
-                # Make naive datetime timezone-aware (assume UTC)
-                date = date.replace(tzinfo=timezone.utc)
-            return (item.score, date)
+        self.save_feed_cache()
         
-        unique_items.sort(key=sort_key, reverse=True)
+        # Sort by score and date (all dates are timezone-aware UTC)
+        unique_items = sorted(by_url.values(), key=lambda item: (item.score, item.published_date), reverse=True)
         
         logger.info(f"Collected {len(unique_items)} unique news items")
         return unique_items
@@ -303,8 +467,7 @@ class ContextEngineeringNewsScraper:
             ]
         }
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        dump_json(data, output_file)
         
         logger.info(f"Saved {len(items)} items to {output_file}")
 
@@ -3,16 +3,164 @@
 RSS Feed Generator for Context Engineering Daily News
 """
 
-import json
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
 from datetime import datetime, timezone
-from typing import Dict, List
-from xml.etree.ElementTree import Element, SubElement, tostring
-from xml.dom import minidom
-import html
+from typing import BinaryIO, Dict, List, Optional
+from xml.sax.saxutils import XMLGenerator
 import logging
 
+try:
+    from .json_utils import load_json
+except ImportError:
+    from json_utils import load_json
+
+# ciso8601 parses ISO-8601 timestamps (including a trailing 'Z') in C
+try:
+    from ciso8601 import parse_datetime
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Same replacements as html.escape(), done in a single pass over the string
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'
+})
+
+def _escape(text: str) -> str:
+    """HTML-escape text for embedding in item HTML"""
+    return text.translate(_HTML_ESCAPE_TABLE)
+
+@lru_cache(maxsize=4096)
+def _escape_cached(text: str) -> str:
+    """_escape for short strings that repeat across items (sources, keywords)"""
+    return _escape(text)
+
+# RFC 822 date format used by RSS 2.0
+RFC822_FORMAT = '%a, %d %b %Y %H:%M:%S %z'
+
+@lru_cache(maxsize=1024)
+def _rfc822_date(published_date: str) -> Optional[str]:
+    """RFC 822 form of an ISO-8601 published_date, or None if it cannot be parsed"""
+    try:
+        if CISO8601_AVAILABLE:
+            return parse_datetime(published_date).strftime(RFC822_FORMAT)
+        return datetime.fromisoformat(published_date.replace('Z', '+00:00')).strftime(RFC822_FORMAT)
+    except ValueError:
+        return None
+
+# Titles of the per-category feeds; other ids are title-cased
+CATEGORY_FEED_NAMES = MappingProxyType({
+    'prompt_engineering': 'Prompt Engineering',
+    'in_context_learning': 'In-Context Learning',
+    'chain_of_thought': 'Chain-of-Thought',
+    'rag_retrieval': 'RAG & Retrieval',
+    'context_management': 'Context Management',
+    'multimodal_context': 'Multimodal Context',
+    'tools_frameworks': 'Tools & Frameworks',
+    'research_papers': 'Research Papers',
+    'industry_news': 'Industry News'
+})
+
+_UNDERSCORE_TO_SPACE = str.maketrans('_', ' ')
+
+@lru_cache(maxsize=256)
+def _category_label(category_id: str) -> str:
+    """Display name used for an item's <category>, e.g. rag_retrieval -> Rag Retrieval"""
+    return category_id.translate(_UNDERSCORE_TO_SPACE).title()
+
+# XML text escaping as done by XMLGenerator.characters()
+_XML_TEXT_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+def _xml_escape(text: str) -> str:
+    """Escape text for use as XML character data"""
+    return text.translate(_XML_TEXT_ESCAPE_TABLE)
+
+@lru_cache(maxsize=4096)
+def _xml_escape_cached(text: str) -> str:
+    """_xml_escape for short strings that repeat across items (sources, categories)"""
+    return _xml_escape(text)
+
+# Every <item> has the same shape, so it is formatted from a fixed template of
+# pre-escaped fields, indented to sit inside <rss><channel>
+ITEM_TMPL = (
+    '\n    <item>'
+    '\n      <title>{title}</title>'
+    '\n      <link>{link}</link>'
+    '\n      <guid isPermaLink="false">{link}</guid>'
+    '\n      <description>{desc}</description>'
+    '{content}'
+    '\n      <pubDate>{pub}</pubDate>'
+    '\n      <author>noreply@contextengineering.news ({author})</author>'
+    '\n      <category>{cat}</category>'
+    '{kw_cats}'
+    '\n    </item>'
+)
+ITEM_CONTENT_TMPL = '\n      <content:encoded><![CDATA[{html}]]></content:encoded>'
+ITEM_CATEGORY_TMPL = '\n      <category>{cat}</category>'
+
+RSS_NAMESPACES = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'content': 'http://purl.org/rss/1.0/modules/content/'
+}
+
+class FeedWriter:
+    """Streams an indented XML document straight to a binary file
+    
+    Elements are written (and escaped by XMLGenerator) as they are produced,
+    so no tree of the whole feed is ever held in memory.
+    """
+    
+    def __init__(self, out: BinaryIO, indent: str = "  "):
+        self._out = out
+        self._xml = XMLGenerator(out, 'utf-8', short_empty_elements=True)
+        self._indent = indent
+        self._depth = 0
+        self._at_start = True
+    
+    def _newline(self):
+        # The root element directly follows the XML declaration's own newline
+        if self._at_start:
+            self._at_start = False
+            return
+        self._xml.ignorableWhitespace('\n' + self._indent * self._depth)
+    
+    def start_document(self):
+        self._xml.startDocument()
+    
+    def end_document(self):
+        self._xml.ignorableWhitespace('\n')
+        self._xml.endDocument()
+    
+    def raw(self, data: bytes):
+        """Splice pre-serialized XML (e.g. ITEM_TMPL output) into the output
+        
+        Only valid between complete elements; XMLGenerator writes through to out.
+        """
+        self._out.write(data)
+    
+    def start(self, name: str, attrs: Optional[Dict[str, str]] = None):
+        """Open an element whose children follow on indented lines"""
+        self._newline()
+        self._xml.startElement(name, attrs or {})
+        self._depth += 1
+    
+    def end(self, name: str):
+        self._depth -= 1
+        self._newline()
+        self._xml.endElement(name)
+    
+    def element(self, name: str, text: Optional[str] = None, attrs: Optional[Dict[str, str]] = None):
+        """Write a complete text-only (or empty) element on its own line"""
+        self._newline()
+        self._xml.startElement(name, attrs or {})
+        if text:
+            self._xml.characters(text)
+        self._xml.endElement(name)
+
 class RSSGenerator:
     def __init__(self):
         self.site_url = "https://your-username.github.io/context-engineering-news"
@@ -20,124 +168,125 @@ class RSSGenerator:
         self.feed_description = "Daily news and research updates in AI Context Engineering, Prompt Engineering, RAG, and LLM development"
         self.feed_language = "en-us"
         self.feed_copyright = f"Copyright {datetime.now().year} Context Engineering Daily"
+        # Formatted once per feed build; also the pubDate of items without a usable date
+        self.build_date = datetime.now(timezone.utc).strftime(RFC822_FORMAT)
     
     def load_news_data(self, data_file: str = "data/daily_news.json") -> Dict:
         """Load news data from JSON file"""
-        with open(data_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    def create_rss_feed(self, items: List[Dict], output_file: str = "docs/rss.xml") -> str:
-        """Generate RSS 2.0 feed"""
-        # Create root RSS element
-        rss = Element('rss', {
-            'version': '2.0',
-            'xmlns:atom': 'http://www.w3.org/2005/Atom',
-            'xmlns:content': 'http://purl.org/rss/1.0/modules/content/'
-        })
-        
-        # Create channel element
-        channel = SubElement(rss, 'channel')
-        
-        # Channel metadata
-        SubElement(channel, 'title').text = self.feed_title
-        SubElement(channel, 'link').text = self.site_url
-        SubElement(channel, 'description').text = self.feed_description
-        SubElement(channel, 'language').text = self.feed_language
-        SubElement(channel, 'copyright').text = self.feed_copyright
-        SubElement(channel, 'generator').text = "Context Engineering News Generator"
-        SubElement(channel, 'lastBuildDate').text = datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S %z')
-        
-        # Add atom:link for self-reference
-        atom_link = SubElement(channel, 'atom:link', {
-            'href': f"{self.site_url}/rss.xml",
-            'rel': 'self',
-            'type': 'application/rss+xml'
-        })
-        
-        # Add category
-        SubElement(channel, 'category').text = "Technology"
-        SubElement(channel, 'category').text = "Artificial Intelligence"
-        SubElement(channel, 'category').text = "Machine Learning"
-        
-        # Add items (limit to latest 50)
-        for item_data in items[:50]:
-            self.add_rss_item(channel, item_data)
-        
-        # Generate XML string
-        rough_string = tostring(rss, encoding='utf-8')
-        reparsed = minidom.parseString(rough_string)
-        pretty_xml = reparsed.toprettyxml(indent="  ", encoding='utf-8')
-        
-        # Remove empty lines and fix encoding declaration
-        xml_lines = [line for line in pretty_xml.decode('utf-8').split('\n') if line.strip()]
-        xml_content = '\n'.join(xml_lines)
-        
-        # Save to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
-        
-        logger.info(f"Generated RSS feed: {output_file}")
-        return xml_content
+        return load_json(data_file)
+    
+    def _start_feed(self, writer: FeedWriter):
+        """Write the XML declaration and open <rss> with its namespaces"""
+        attrs = {'version': '2.0'}
+        attrs.update({f'xmlns:{prefix}': uri for prefix, uri in RSS_NAMESPACES.items()})
+        writer.start_document()
+        writer.start('rss', attrs)
+    
+    def _end_feed(self, writer: FeedWriter):
+        writer.end('channel')
+        writer.end('rss')
+        writer.end_document()
     
-    def add_rss_item(self, channel: Element, item_data: Dict):
-        """Add a single item to RSS feed"""
-        item = SubElement(channel, 'item')
+    def _item_xml(self, item_data: Dict, item_xml: Dict[str, bytes]) -> bytes:
+        """Serialized <item> for item_data, built once per URL and reused from item_xml"""
+        blob = item_xml.get(item_data['url'])
+        if blob is None:
+            blob = self.render_item(item_data).encode('utf-8', 'xmlcharrefreplace')
+            item_xml[item_data['url']] = blob
+        return blob
+    
+    def create_rss_feed(self, items: List[Dict], output_file: str = "docs/rss.xml",
+                        item_xml: Optional[Dict[str, bytes]] = None) -> str:
+        """Generate RSS 2.0 feed, streamed to output_file (which is returned)
         
-        # Basic item data
-        SubElement(item, 'title').text = html.escape(item_data['title'])
-        SubElement(item, 'link').text = item_data['url']
-        SubElement(item, 'guid', {'isPermaLink': 'false'}).text = item_data['url']
+        item_xml caches serialized items by URL so feeds sharing items build them once.
+        """
+        if item_xml is None:
+            item_xml = {}
+        self.build_date = datetime.now(timezone.utc).strftime(RFC822_FORMAT)
         
-        # Description with HTML content
-        description_html = self.format_item_description(item_data)
-        SubElement(item, 'description').text = html.escape(description_html)
+        with open(output_file, 'wb') as f:
+            writer = FeedWriter(f)
+            self._start_feed(writer)
+            writer.start('channel')
+            
+            # Channel metadata
+            writer.element('title', self.feed_title)
+            writer.element('link', self.site_url)
+            writer.element('description', self.feed_description)
+            writer.element('language', self.feed_language)
+            writer.element('copyright', self.feed_copyright)
+            writer.element('generator', "Context Engineering News Generator")
+            writer.element('lastBuildDate', self.build_date)
+            
+            # Add atom:link for self-reference
+            writer.element('atom:link', attrs={
+                'href': f"{self.site_url}/rss.xml",
+                'rel': 'self',
+                'type': 'application/rss+xml'
+            })
+            
+            # Add category
+            writer.element('category', "Technology")
+            writer.element('category', "Artificial Intelligence")
+            writer.element('category', "Machine Learning")
+            
+            # Add items (limit to latest 50)
+            writer.raw(b''.join(self._item_xml(item_data, item_xml) for item_data in items[:50]))
+            
+            self._end_feed(writer)
         
+        logger.info(f"Generated RSS feed: {output_file}")
+        return output_file
+    
+    def render_item(self, item_data: Dict) -> str:
+        """Serialized <item> for item_data, indented for splicing into <channel>"""
         # Enhanced content if available
+        content = ''
         if 'ai_summary' in item_data:
             content_html = f"""
             <div>
                 <h3>Summary</h3>
-                <p>{html.escape(item_data['ai_summary'])}</p>
+                <p>{_escape(item_data['ai_summary'])}</p>
                 <h3>Original Description</h3>
-                <p>{html.escape(item_data['description'])}</p>
+                <p>{_escape(item_data['description'])}</p>
             </div>
             """
-            content_elem = SubElement(item, 'content:encoded')
-            content_elem.text = content_html
+            content = ITEM_CONTENT_TMPL.format(html=content_html.replace(']]>', ']]]]><![CDATA[>'))
         
-        # Publication date
-        try:
-            pub_date = datetime.fromisoformat(item_data['published_date'].replace('Z', '+00:00'))
-            SubElement(item, 'pubDate').text = pub_date.strftime('%a, %d %b %Y %H:%M:%S %z')
-        except:
-            SubElement(item, 'pubDate').text = datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S %z')
-        
-        # Source
-        SubElement(item, 'author').text = f"noreply@contextengineering.news ({item_data['source']})"
-        
-        # Categories (from keywords)
-        category_name = item_data.get('category', 'general').replace('_', ' ').title()
-        SubElement(item, 'category').text = category_name
-        
-        # Add keywords as additional categories
-        for keyword in item_data.get('keywords', [])[:3]:  # Limit to 3 keywords
-            SubElement(item, 'category').text = keyword
+        return ITEM_TMPL.format(
+            title=_xml_escape(item_data['title']),
+            link=_xml_escape(item_data['url']),
+            # Description with HTML content (XML-escaped once here)
+            desc=_xml_escape(self.format_item_description(item_data)),
+            content=content,
+            pub=_rfc822_date(item_data.get('published_date') or '') or self.build_date,
+            author=_xml_escape_cached(item_data['source']),
+            cat=_xml_escape_cached(_category_label(item_data.get('category', 'general'))),
+            # Add keywords as additional categories (limit to 3)
+            kw_cats=''.join(ITEM_CATEGORY_TMPL.format(cat=_xml_escape_cached(keyword))
+                            for keyword in item_data.get('keywords', [])[:3])
+        )
+    
+    def add_rss_item(self, writer: FeedWriter, item_data: Dict):
+        """Write a single item to the RSS feed"""
+        writer.raw(self.render_item(item_data).encode('utf-8', 'xmlcharrefreplace'))
     
     def format_item_description(self, item_data: Dict) -> str:
-        """Format item description with metadata"""
-        description = item_data['description']
-        source = item_data['source']
+        """Format item description with metadata as HTML (text fields HTML-escaped)"""
+        description = _escape(item_data['description'])
+        source = _escape_cached(item_data['source'])
         
         # Add AI summary if available
         if 'ai_summary' in item_data:
-            description = f"<strong>AI Summary:</strong> {item_data['ai_summary']}<br><br>{description}"
+            description = f"<strong>AI Summary:</strong> {_escape(item_data['ai_summary'])}<br><br>{description}"
         
         # Add metadata
         metadata = f"<br><br><small><strong>Source:</strong> {source}"
         
         # Add keywords
         if item_data.get('keywords'):
-            keywords = ', '.join(item_data['keywords'][:5])
+            keywords = ', '.join(_escape_cached(keyword) for keyword in item_data['keywords'][:5])
             metadata += f" | <strong>Keywords:</strong> {keywords}"
         
         # Add relevance score
@@ -149,74 +298,57 @@ class RSSGenerator:
         
         return description + metadata
     
-    def generate_category_feeds(self, items: List[Dict], output_dir: str = "docs"):
-        """Generate separate RSS feeds for each category"""
+    def generate_category_feeds(self, items: List[Dict], output_dir: str = "docs",
+                                item_xml: Optional[Dict[str, bytes]] = None):
+        """Generate separate RSS feeds for each category (item_xml: see create_rss_feed)"""
+        if item_xml is None:
+            item_xml = {}
+        
         # Group items by category
-        categories = {}
+        categories = defaultdict(list)
         for item in items:
-            category = item.get('category', 'general')
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(item)
-        
-        category_names = {
-            'prompt_engineering': 'Prompt Engineering',
-            'in_context_learning': 'In-Context Learning', 
-            'chain_of_thought': 'Chain-of-Thought',
-            'rag_retrieval': 'RAG & Retrieval',
-            'context_management': 'Context Management',
-            'multimodal_context': 'Multimodal Context',
-            'tools_frameworks': 'Tools & Frameworks',
-            'research_papers': 'Research Papers',
-            'industry_news': 'Industry News'
-        }
+            categories[item.get('category', 'general')].append(item)
         
         for category_id, category_items in categories.items():
             if len(category_items) < 3:  # Skip categories with too few items
                 continue
             
-            category_name = category_names.get(category_id, category_id.replace('_', ' ').title())
-            
-            # Create category-specific RSS
-            rss = Element('rss', {
-                'version': '2.0',
-                'xmlns:atom': 'http://www.w3.org/2005/Atom'
-            })
-            
-            channel = SubElement(rss, 'channel')
-            SubElement(channel, 'title').text = f"{self.feed_title} - {category_name}"
-            SubElement(channel, 'link').text = f"{self.site_url}#{category_id}"
-            SubElement(channel, 'description').text = f"Latest {category_name} news in Context Engineering"
-            SubElement(channel, 'language').text = self.feed_language
-            
-            # Add items
-            for item_data in category_items[:20]:  # Limit to 20 items per category
-                self.add_rss_item(channel, item_data)
-            
-            # Save category feed
-            rough_string = tostring(rss, encoding='utf-8')
-            reparsed = minidom.parseString(rough_string)
-            pretty_xml = reparsed.toprettyxml(indent="  ", encoding='utf-8')
-            
-            xml_lines = [line for line in pretty_xml.decode('utf-8').split('\n') if line.strip()]
-            xml_content = '\n'.join(xml_lines)
+            category_name = CATEGORY_FEED_NAMES.get(category_id) or _category_label(category_id)
             
+            # Stream category-specific RSS
             output_file = f"{output_dir}/rss-{category_id.replace('_', '-')}.xml"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(xml_content)
+            with open(output_file, 'wb') as f:
+                writer = FeedWriter(f)
+                self._start_feed(writer)
+                writer.start('channel')
+                writer.element('title', f"{self.feed_title} - {category_name}")
+                writer.element('link', f"{self.site_url}#{category_id}")
+                writer.element('description', f"Latest {category_name} news in Context Engineering")
+                writer.element('language', self.feed_language)
+                
+                # Add items
+                writer.raw(b''.join(  # Limit to 20 items per category
+                    self._item_xml(item_data, item_xml) for item_data in category_items[:20]
+                ))
+                
+                self._end_feed(writer)
             
             logger.info(f"Generated category RSS feed: {output_file}")
     
-    def generate_feeds(self, data_file: str = "data/daily_news.json"):
-        """Generate all RSS feeds"""
-        news_data = self.load_news_data(data_file)
+    def generate_feeds(self, data_file: str = "data/daily_news.json", news_data: Optional[Dict] = None):
+        """Generate all RSS feeds (from news_data when given, else loaded from data_file)"""
+        if news_data is None:
+            news_data = self.load_news_data(data_file)
         items = news_data['items']
         
+        # Each item is serialized once and shared by every feed it appears in
+        item_xml = {}
+        
         # Generate main RSS feed
-        self.create_rss_feed(items)
+        self.create_rss_feed(items, item_xml=item_xml)
         
         # Generate category-specific feeds
-        self.generate_category_feeds(items)
+        self.generate_category_feeds(items, item_xml=item_xml)
         
         logger.info(f"Generated RSS feeds for {len(items)} items")
 
@@ -6,13 +6,24 @@ Basic tests for Context Engineering Daily News
 import os
 import sys
 import json
-import tempfile
 from pathlib import Path
 import pytest
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+@pytest.fixture(scope='session')
+def scraper():
+    """Scraper shared by every test that only needs categorization"""
+    from news_scraper import ContextEngineeringNewsScraper
+    return ContextEngineeringNewsScraper('config')
+
+@pytest.fixture(scope='session')
+def generator():
+    """Newsletter generator shared across tests"""
+    from html_generator import NewsletterGenerator
+    return NewsletterGenerator('config')
+
 def test_config_loading():
     """Test that configuration files can be loaded"""
     config_dir = Path(__file__).parent.parent / 'config'
@@ -56,12 +67,8 @@ def test_html_generator_import():
     except ImportError as e:
         pytest.fail(f"Failed to import html_generator: {e}")
 
-def test_categorization():
+def test_categorization(scraper):
     """Test news categorization logic"""
-    from news_scraper import ContextEngineeringNewsScraper
-    
-    scraper = ContextEngineeringNewsScraper('config')
-    
     # Test prompt engineering categorization
     category, score, keywords = scraper.categorize_content(
         "Advanced Prompt Engineering Techniques for LLMs",
@@ -79,10 +86,8 @@ def test_categorization():
     
     assert score < 0.3  # Should have low relevance
 
-def test_sample_data_processing():
+def test_sample_data_processing(generator):
     """Test processing of sample news data"""
-    from html_generator import NewsletterGenerator
-    
     # Create sample data
     sample_data = {
         "generated_at": "2024-01-01T12:00:00",
@@ -111,29 +116,15 @@ def test_sample_data_processing():
         ]
     }
     
-    # Save sample data to temp file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(sample_data, f)
-        temp_file = f.name
+    categories = generator.organize_by_category(sample_data['items'])
     
-    try:
-        generator = NewsletterGenerator('config')
-        categories = generator.organize_by_category(sample_data['items'])
-        
-        assert 'prompt_engineering' in categories
-        assert 'rag_retrieval' in categories
-        assert len(categories['prompt_engineering']['news_items']) == 1
-        assert len(categories['rag_retrieval']['news_items']) == 1
-        
-    finally:
-        os.unlink(temp_file)
+    assert 'prompt_engineering' in categories
+    assert 'rag_retrieval' in categories
+    assert len(categories['prompt_engineering']['news_items']) == 1
+    assert len(categories['rag_retrieval']['news_items']) == 1
 
-def test_trending_keywords():
+def test_trending_keywords(generator):
     """Test trending keywords extraction"""
-    from html_generator import NewsletterGenerator
-    
-    generator = NewsletterGenerator('config')
-    
     sample_items = [
         {"keywords": ["prompt", "engineering", "LLM"]},
         {"keywords": ["prompt", "GPT", "fine-tuning"]},
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+RSS feed serialization tests for Context Engineering Daily News
+"""
+
+import os
+import sys
+import xml.etree.ElementTree as ET
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+CONTENT_NS = '{http://purl.org/rss/1.0/modules/content/}'
+
+# Text fields full of XML metacharacters, including the CDATA terminator
+TRICKY_ITEM = {
+    'title': 'Q&A: <RAG> vs. long context ]]> what wins?',
+    'url': 'https://example.com/post?a=1&b=<2>',
+    'description': 'Compare A & B <b>tags</b> and the ]]> sequence',
+    'ai_summary': 'Summary with & and <script>alert(1)</script> and ]]> inside',
+    'source': 'R&D <Weekly>',
+    'published_date': '2024-01-15T10:30:00Z',
+    'category': 'rag_systems',
+    'keywords': ['Q&A', '<tokens>', 'a]]>b'],
+    'score': 0.87
+}
+
+@pytest.fixture
+def feed(tmp_path):
+    """Parsed RSS feed containing TRICKY_ITEM and a plain item"""
+    from rss_generator import RSSGenerator
+    generator = RSSGenerator()
+    plain_item = {
+        'title': 'Plain title',
+        'url': 'https://example.com/plain',
+        'description': 'Plain description',
+        'source': 'Blog',
+        'category': 'general'
+    }
+    output_file = generator.create_rss_feed([TRICKY_ITEM, plain_item], str(tmp_path / 'rss.xml'))
+    with open(output_file, 'rb') as f:
+        raw = f.read()
+    return generator, raw, ET.fromstring(raw)
+
+def test_feed_is_well_formed(feed):
+    """Test that the feed parses and has both items"""
+    _, _, root = feed
+    assert root.tag == 'rss'
+    assert len(root.findall('channel/item')) == 2
+
+def test_text_fields_round_trip(feed):
+    """Test that escaped fields parse back to the original text, escaped only once"""
+    _, _, root = feed
+    item = root.find('channel/item')
+    assert item.findtext('title') == TRICKY_ITEM['title']
+    assert item.findtext('link') == TRICKY_ITEM['url']
+    assert item.findtext('guid') == TRICKY_ITEM['url']
+    assert item.findtext('author') == f"noreply@contextengineering.news ({TRICKY_ITEM['source']})"
+    categories = [category.text for category in item.findall('category')]
+    assert categories == ['Rag Systems'] + TRICKY_ITEM['keywords']
+
+def test_description_is_html_escaped_once(feed):
+    """Test that the description carries HTML-escaped text, not double-escaped entities"""
+    generator, _, root = feed
+    description = root.find('channel/item').findtext('description')
+    assert description == generator.format_item_description(TRICKY_ITEM)
+    assert 'Compare A &amp; B &lt;b&gt;tags&lt;/b&gt;' in description
+    assert '&amp;amp;' not in description
+    assert '&amp;lt;' not in description
+
+def test_content_encoded_cdata(feed):
+    """Test that content:encoded is a well-formed CDATA block with the escaped summary"""
+    from rss_generator import _escape
+    _, raw, root = feed
+    items = root.findall('channel/item')
+
+    content = items[0].findtext(f'{CONTENT_NS}encoded')
+    assert _escape(TRICKY_ITEM['ai_summary']) in content
+    assert _escape(TRICKY_ITEM['description']) in content
+    assert '<script>' not in content
+    # Exactly one CDATA section, closed once
+    assert raw.count(b'<![CDATA[') == 1
+    assert raw.count(b']]></content:encoded>') == 1
+
+    # Items without an AI summary have no content:encoded
+    assert items[1].find(f'{CONTENT_NS}encoded') is None
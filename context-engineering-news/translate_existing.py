@@ -3,9 +3,11 @@
 기존 뉴스 데이터에 한글 번역 추가하는 스크립트
 """
 
-import json
 import os
-from src.ai_summarizer import AISummarizer
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.ai_summarizer import AISummarizer, ENHANCE_BATCH_SIZE, ENHANCE_CONCURRENCY
+from src.fs_utils import link_or_copy
+from src.json_utils import load_json, dump_json
 import time
 
 def translate_existing_news():
@@ -29,8 +31,7 @@ def translate_existing_news():
     
     # 기존 데이터 로드
     try:
-        with open('data/daily_news.json', 'r', encoding='utf-8') as f:
-            news_data = json.load(f)
+        news_data = load_json('data/daily_news.json')
     except FileNotFoundError:
         print("❌ data/daily_news.json 파일을 찾을 수 없습니다.")
         return False
@@ -46,54 +47,55 @@ def translate_existing_news():
         print("✅ 모든 기사가 이미 번역되어 있습니다.")
         return True
     
-    # 번역 작업
+    # 번역 작업: ENHANCE_BATCH_SIZE개 기사를 한 번의 요청으로 번역하고, 여러 요청을
+    # 동시에 보냄 (요청 속도는 AISummarizer의 rate limiter가 조절)
     translated_count = 0
     failed_count = 0
-    
-    for i, item in enumerate(needs_translation):
-        print(f"\n🌐 [{i+1}/{len(needs_translation)}] 번역 중: {item['title'][:50]}...")
+    by_url = {original_item['url']: original_item for original_item in items}
+    batches = [
+        needs_translation[start:start + ENHANCE_BATCH_SIZE]
+        for start in range(0, len(needs_translation), ENHANCE_BATCH_SIZE)
+    ]
+    done_count = 0
+    
+    with ThreadPoolExecutor(max_workers=ENHANCE_CONCURRENCY) as pool:
+        futures = {
+            pool.submit(summarizer.translate_and_summarize_korean_batch, batch): batch
+            for batch in batches
+        }
         
-        try:
-            # 한글 번역 및 요약 생성
-            korean_data = summarizer.translate_and_summarize_korean(
-                item['title'],
-                item['description'],
-                item.get('content', '')
-            )
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"  ❌ 오류: {e}")
+                results = [None] * len(batch)
             
-            if korean_data and korean_data.get('korean_title'):
-                # 원본 데이터에 번역 정보 추가
-                for original_item in items:
-                    if original_item['url'] == item['url']:  # URL로 매칭
-                        original_item.update(korean_data)
-                        break
+            for item, korean_data in zip(batch, results):
+                done_count += 1
+                print(f"\n🌐 [{done_count}/{len(needs_translation)}] 번역 완료: {item['title'][:50]}...")
                 
-                translated_count += 1
-                print(f"  ✅ 성공: {korean_data['korean_title']}")
-                print(f"  📝 요약: {korean_data['korean_summary'][:100]}...")
-            else:
-                failed_count += 1
-                print("  ❌ 번역 실패")
-            
-            # API 제한을 위한 대기
-            time.sleep(1)
-            
-        except Exception as e:
-            failed_count += 1
-            print(f"  ❌ 오류: {e}")
-            time.sleep(2)  # 오류 시 더 오래 대기
+                if korean_data and korean_data.get('korean_title'):
+                    # 원본 데이터에 번역 정보 추가 (URL로 매칭)
+                    by_url[item['url']].update(korean_data)
+                    
+                    translated_count += 1
+                    print(f"  ✅ 성공: {korean_data['korean_title']}")
+                    print(f"  📝 요약: {korean_data['korean_summary'][:100]}...")
+                else:
+                    failed_count += 1
+                    print("  ❌ 번역 실패")
     
     # 결과 저장
     news_data['items'] = items
     news_data['translation_updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
     
     try:
-        with open('data/daily_news_korean.json', 'w', encoding='utf-8') as f:
-            json.dump(news_data, f, indent=2, ensure_ascii=False)
+        dump_json(news_data, 'data/daily_news_korean.json')
         
         # 원본도 업데이트
-        with open('data/daily_news.json', 'w', encoding='utf-8') as f:
-            json.dump(news_data, f, indent=2, ensure_ascii=False)
+        dump_json(news_data, 'data/daily_news.json')
         
         print(f"\n🎉 번역 완료!")
         print(f"  ✅ 성공: {translated_count}개")
@@ -120,9 +122,8 @@ def regenerate_html():
             output_file="docs/index.html"
         )
         
-        # 루트 docs에도 복사
-        import shutil
-        shutil.copy("context-engineering-news/docs/index.html", "../docs/index.html")
+        # 루트 docs에도 하드링크 (다른 파일시스템이면 복사)
+        link_or_copy("docs/index.html", "../docs/index.html")
         
         print("✅ HTML 뉴스레터 재생성 완료")
         return True
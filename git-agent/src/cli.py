@@ -3,31 +3,38 @@
 Git Agent CLI - Command line interface for LLM-powered Git operations
 """
 
+import functools
 import logging
 import sys
 import os
+from dataclasses import asdict
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
 
 import click
 from rich.console import Console
-from rich.logging import RichHandler
-from rich.panel import Panel
-from rich.table import Table
-from rich.text import Text
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from .config import get_config, reload_config
-from .llm_providers import LLMManager
-from .git_operations import GitAgent, GitOperationResult
+from .config import Config, get_config, use_config
+
+# The LLM SDKs and most of rich are imported inside the commands
+# that use them, so --help and config-info start without loading them
+if TYPE_CHECKING:
+    from .llm_providers import LLMManager
+    from .git_operations import GitOperationResult
 
 console = Console()
 
+# A commit message is a line or two, so don't reserve the provider's full output budget
+COMMIT_MESSAGE_MAX_TOKENS = 128
+
 
 def setup_logging(level: str = "INFO"):
     """Setup logging with rich handler"""
+    from rich.logging import RichHandler
+    
     logging.basicConfig(
         level=getattr(logging, level.upper()),
         format="%(message)s",
@@ -36,15 +43,17 @@ def setup_logging(level: str = "INFO"):
     )
 
 
-def initialize_llm_manager() -> LLMManager:
+def initialize_llm_manager() -> "LLMManager":
     """Initialize LLM manager with configured providers"""
+    from .llm_providers import LLMManager
+    
     config = get_config()
     llm_manager = LLMManager()
     
     # Add configured providers
     for name, provider_config in config.llm_providers.items():
         if provider_config.enabled:
-            success = llm_manager.add_provider(name, provider_config.model_dump())
+            success = llm_manager.add_provider(name, asdict(provider_config))
             if success:
                 console.print(f"✅ Initialized {name} provider", style="green")
             else:
@@ -56,8 +65,16 @@ def initialize_llm_manager() -> LLMManager:
     return llm_manager
 
 
-def print_operation_result(result: GitOperationResult):
+def print_operation_result(result: "GitOperationResult"):
     """Print formatted operation result"""
+    if not console.is_terminal:
+        click.echo(f"{'success' if result.success else 'failed'}\t{result.message}")
+        if not result.success and result.details:
+            click.echo(result.details)
+        return
+    
+    from rich.panel import Panel
+    
     if result.success:
         panel = Panel(
             f"[green]{result.message}[/green]",
@@ -74,6 +91,41 @@ def print_operation_result(result: GitOperationResult):
     console.print(panel)
 
 
+def print_table(title: str, columns: Sequence[Tuple[str, str]], rows: Iterable[Sequence[str]]):
+    """Print rows as a Rich table, or as tab-separated lines when output is piped
+    
+    columns holds (header, style) pairs.
+    """
+    if not console.is_terminal:
+        click.echo("\t".join(header for header, _ in columns))
+        for row in rows:
+            click.echo("\t".join(row))
+        return
+    
+    from rich.table import Table
+    
+    table = Table(title=title)
+    for header, style in columns:
+        table.add_column(header, style=style)
+    for row in rows:
+        table.add_row(*row)
+    console.print(table)
+
+
+def _cli_safe(fn):
+    """Report errors raised by a command and exit with status 1"""
+    @functools.wraps(fn)
+    def wrapper(ctx, *args, **kwargs):
+        try:
+            return fn(ctx, *args, **kwargs)
+        except Exception as e:
+            console.print(f"❌ Error: {e}", style="red")
+            if ctx.obj.get('verbose'):
+                console.print_exception()
+            sys.exit(1)
+    return wrapper
+
+
 @click.group()
 @click.option('--config', '-c', help='Path to configuration file')
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose logging')
@@ -84,10 +136,12 @@ def cli(ctx, config, verbose):
     log_level = "DEBUG" if verbose else "INFO"
     setup_logging(log_level)
     
-    # Load configuration
+    # Load configuration once and pin it for the subcommand
     if config:
         os.environ['GIT_AGENT_CONFIG'] = config
-        reload_config()
+        use_config(Config(config))
+    else:
+        use_config(get_config())
     
     # Store in context
     ctx.ensure_object(dict)
@@ -96,192 +150,166 @@ def cli(ctx, config, verbose):
 
 @cli.command()
 @click.argument('path', type=click.Path(exists=True), default='.')
+@click.option('--no-fetch', is_flag=True, help='Skip fetching before analyzing the repository')
 @click.pass_context
-def pull(ctx, path):
+@_cli_safe
+def pull(ctx, path, no_fetch):
     """Perform git pull with LLM-powered conflict resolution"""
-    try:
-        llm_manager = initialize_llm_manager()
-        git_agent = GitAgent(path, llm_manager)
-        
-        console.print(f"🔄 Pulling repository: {Path(path).resolve()}")
-        
-        result = git_agent.pull()
-        print_operation_result(result)
-        
-        if not result.success:
-            sys.exit(1)
-            
-    except Exception as e:
-        console.print(f"❌ Error: {e}", style="red")
-        if ctx.obj.get('verbose'):
-            console.print_exception()
+    from .git_operations import GitAgent
+    
+    llm_manager = initialize_llm_manager()
+    git_agent = GitAgent(path, llm_manager, fetch_before_status=not no_fetch)
+    
+    console.print(f"🔄 Pulling repository: {Path(path).resolve()}")
+    
+    result = git_agent.pull()
+    print_operation_result(result)
+    
+    if not result.success:
         sys.exit(1)
 
 
 @cli.command()
 @click.argument('path', type=click.Path(exists=True), default='.')
+@click.option('--no-fetch', is_flag=True, help='Skip fetching before analyzing the repository')
 @click.pass_context
-def push(ctx, path):
+@_cli_safe
+def push(ctx, path, no_fetch):
     """Perform git push with LLM-powered conflict resolution"""
-    try:
-        llm_manager = initialize_llm_manager()
-        git_agent = GitAgent(path, llm_manager)
-        
-        console.print(f"⬆️ Pushing repository: {Path(path).resolve()}")
-        
-        result = git_agent.push()
-        print_operation_result(result)
-        
-        if not result.success:
-            sys.exit(1)
-            
-    except Exception as e:
-        console.print(f"❌ Error: {e}", style="red")
-        if ctx.obj.get('verbose'):
-            console.print_exception()
+    from .git_operations import GitAgent
+    
+    llm_manager = initialize_llm_manager()
+    git_agent = GitAgent(path, llm_manager, fetch_before_status=not no_fetch)
+    
+    console.print(f"⬆️ Pushing repository: {Path(path).resolve()}")
+    
+    result = git_agent.push()
+    print_operation_result(result)
+    
+    if not result.success:
         sys.exit(1)
 
 
 @cli.command()
 @click.argument('path', type=click.Path(exists=True), default='.')
 @click.pass_context
+@_cli_safe
 def status(ctx, path):
     """Show detailed repository status"""
-    try:
-        llm_manager = initialize_llm_manager()
-        git_agent = GitAgent(path, llm_manager)
-        
-        console.print(f"📊 Repository status: {Path(path).resolve()}")
-        
-        status = git_agent.status()
-        
-        # Create status table
-        table = Table(title="Git Repository Status")
-        table.add_column("Property", style="cyan")
-        table.add_column("Value", style="white")
-        
-        # Clean status
-        clean_icon = "✅" if status['clean'] else "❌"
-        table.add_row("Clean", f"{clean_icon} {status['clean']}")
-        
-        # File counts
-        table.add_row("Staged files", str(len(status['staged_files'])))
-        table.add_row("Modified files", str(len(status['modified_files'])))
-        table.add_row("Untracked files", str(len(status['untracked_files'])))
-        table.add_row("Conflicts", str(len(status['conflicts'])))
-        
-        # Sync status
-        if status['ahead'] > 0:
-            table.add_row("Ahead", f"⬆️ {status['ahead']} commits")
-        if status['behind'] > 0:
-            table.add_row("Behind", f"⬇️ {status['behind']} commits")
-        
-        console.print(table)
-        
-        # Show conflicts if any
-        if status['conflicts']:
-            console.print("\n🚨 Conflicted files:", style="red bold")
-            for conflict in status['conflicts']:
-                console.print(f"  - {conflict}", style="red")
-                
-    except Exception as e:
-        console.print(f"❌ Error: {e}", style="red")
-        if ctx.obj.get('verbose'):
-            console.print_exception()
-        sys.exit(1)
+    from .git_operations import GitAgent
+    
+    llm_manager = initialize_llm_manager()
+    git_agent = GitAgent(path, llm_manager)
+    
+    console.print(f"📊 Repository status: {Path(path).resolve()}")
+    
+    status = git_agent.status()
+    
+    # Clean status
+    clean_icon = "✅" if status['clean'] else "❌"
+    rows: List[Tuple[str, str]] = [("Clean", f"{clean_icon} {status['clean']}")]
+    
+    # File counts
+    rows.append(("Staged files", str(len(status['staged_files']))))
+    rows.append(("Modified files", str(len(status['modified_files']))))
+    rows.append(("Untracked files", str(len(status['untracked_files']))))
+    rows.append(("Conflicts", str(len(status['conflicts']))))
+    
+    # Sync status
+    if status['ahead'] > 0:
+        rows.append(("Ahead", f"⬆️ {status['ahead']} commits"))
+    if status['behind'] > 0:
+        rows.append(("Behind", f"⬇️ {status['behind']} commits"))
+    
+    print_table("Git Repository Status", [("Property", "cyan"), ("Value", "white")], rows)
+    
+    # Show conflicts if any
+    if status['conflicts']:
+        console.print("\n🚨 Conflicted files:", style="red bold")
+        for conflict in status['conflicts']:
+            console.print(f"  - {conflict}", style="red")
 
 
 @cli.command()
 @click.pass_context
+@_cli_safe
 def config_info(ctx):
     """Show current configuration"""
-    try:
-        config = get_config()
-        
-        console.print("⚙️ Git Agent Configuration")
-        
-        # LLM Providers table
-        providers_table = Table(title="LLM Providers")
-        providers_table.add_column("Provider", style="cyan")
-        providers_table.add_column("Enabled", style="white")
-        providers_table.add_column("Model", style="yellow")
-        providers_table.add_column("API Key", style="dim")
-        
-        for name, provider in config.llm_providers.items():
-            enabled = "✅" if provider.enabled else "❌"
-            api_key_status = "✅ Set" if provider.api_key else "❌ Missing"
-            providers_table.add_row(name, enabled, provider.model, api_key_status)
-        
-        console.print(providers_table)
-        
-        # Git settings table
-        git_table = Table(title="Git Settings")
-        git_table.add_column("Setting", style="cyan")
-        git_table.add_column("Value", style="white")
-        
-        settings = config.git_settings
-        git_table.add_row("Auto stash", "✅" if settings.auto_stash else "❌")
-        git_table.add_row("Force push allowed", "✅" if settings.force_push_allowed else "❌")
-        git_table.add_row("Backup before operations", "✅" if settings.backup_before_operations else "❌")
-        git_table.add_row("Max retry attempts", str(settings.max_retry_attempts))
-        git_table.add_row("Conflict resolution", settings.conflict_resolution_strategy)
-        
-        console.print(git_table)
-        
-        # Configuration file path
-        console.print(f"\n📄 Config file: {config.config_path}")
-        
-    except Exception as e:
-        console.print(f"❌ Error: {e}", style="red")
-        if ctx.obj.get('verbose'):
-            console.print_exception()
-        sys.exit(1)
+    config = get_config()
+    
+    console.print("⚙️ Git Agent Configuration")
+    
+    # LLM Providers table
+    provider_rows = []
+    for name, provider in config.llm_providers.items():
+        enabled = "✅" if provider.enabled else "❌"
+        api_key_status = "✅ Set" if provider.api_key else "❌ Missing"
+        provider_rows.append((name, enabled, provider.model, api_key_status))
+    
+    print_table(
+        "LLM Providers",
+        [("Provider", "cyan"), ("Enabled", "white"), ("Model", "yellow"), ("API Key", "dim")],
+        provider_rows
+    )
+    
+    # Git settings table
+    settings = config.git_settings
+    print_table("Git Settings", [("Setting", "cyan"), ("Value", "white")], [
+        ("Auto stash", "✅" if settings.auto_stash else "❌"),
+        ("Force push allowed", "✅" if settings.force_push_allowed else "❌"),
+        ("Backup before operations", "✅" if settings.backup_before_operations else "❌"),
+        ("Max retry attempts", str(settings.max_retry_attempts)),
+        ("Conflict resolution", settings.conflict_resolution_strategy)
+    ])
+    
+    # Configuration file path
+    console.print(f"\n📄 Config file: {config.config_path}")
 
 
 @cli.command()
 @click.argument('provider', type=click.Choice(['gemini', 'openai', 'anthropic']))
 @click.argument('api_key')
 @click.pass_context
+@_cli_safe
 def setup_provider(ctx, provider, api_key):
     """Setup LLM provider with API key"""
-    try:
-        config = get_config()
+    config = get_config()
+    
+    if provider in config.llm_providers:
+        config.llm_providers[provider].enabled = True
+        config.llm_providers[provider].api_key = api_key
+        config.save_config()
         
-        if provider in config.llm_providers:
-            config.llm_providers[provider].enabled = True
-            config.llm_providers[provider].api_key = api_key
-            config.save_config()
-            
-            console.print(f"✅ {provider} provider configured successfully", style="green")
-            console.print("💡 Tip: You can also set environment variables like GEMINI_API_KEY", style="dim")
-        else:
-            console.print(f"❌ Unknown provider: {provider}", style="red")
-            
-    except Exception as e:
-        console.print(f"❌ Error: {e}", style="red")
-        if ctx.obj.get('verbose'):
-            console.print_exception()
-        sys.exit(1)
+        console.print(f"✅ {provider} provider configured successfully", style="green")
+        console.print("💡 Tip: You can also set environment variables like GEMINI_API_KEY", style="dim")
+    else:
+        console.print(f"❌ Unknown provider: {provider}", style="red")
 
 
 @cli.command()
 @click.argument('message')
 @click.argument('path', type=click.Path(exists=True), default='.')
+@click.option('--include-untracked', '-u', is_flag=True, help='Also add untracked files (runs git add first)')
 @click.pass_context
-def smart_commit(ctx, message, path):
-    """Smart commit with LLM-suggested improvements"""
-    try:
-        llm_manager = initialize_llm_manager()
-        git_agent = GitAgent(path, llm_manager)
-        
-        console.print(f"🧠 Smart commit for: {Path(path).resolve()}")
+@_cli_safe
+def smart_commit(ctx, message, path, include_untracked):
+    """Smart commit with LLM-suggested improvements
+    
+    Commits all changes to tracked files, like git commit -a.
+    """
+    from .git_operations import GitAgent
+    
+    llm_manager = initialize_llm_manager()
+    git_agent = GitAgent(path, llm_manager)
+    
+    console.print(f"🧠 Smart commit for: {Path(path).resolve()}")
+    
+    if llm_manager.is_available():
+        # Get repository status
+        status = git_agent.status()
         
-        if llm_manager.is_available():
-            # Get repository status
-            status = git_agent.status()
-            
-            # Generate LLM prompt for commit message improvement
-            prompt = f"""
+        # Generate LLM prompt for commit message improvement
+        prompt = f"""
 Please review and improve this git commit message: "{message}"
 
 Current repository changes:
@@ -291,29 +319,25 @@ Current repository changes:
 Provide a better commit message following conventional commit format if appropriate.
 Respond with just the improved commit message, nothing else.
 """
-            
-            improved_message = llm_manager.generate_response(prompt)
-            if improved_message:
-                console.print(f"💡 LLM suggested: {improved_message.strip()}")
-                if click.confirm("Use LLM-suggested commit message?"):
-                    message = improved_message.strip()
         
-        # Perform commit
+        improved_message = llm_manager.generate_response(prompt, max_tokens=COMMIT_MESSAGE_MAX_TOKENS)
+        if improved_message:
+            console.print(f"💡 LLM suggested: {improved_message.strip()}")
+            if click.confirm("Use LLM-suggested commit message?"):
+                message = improved_message.strip()
+    
+    # Perform commit (a single git call unless untracked files must be added)
+    if include_untracked:
         success, output = git_agent._run_git_command(["add", "."])
-        if success:
-            success, output = git_agent._run_git_command(["commit", "-m", message])
-            if success:
-                console.print("✅ Commit successful", style="green")
-            else:
-                console.print(f"❌ Commit failed: {output}", style="red")
-        else:
+        if not success:
             console.print(f"❌ Add failed: {output}", style="red")
-            
-    except Exception as e:
-        console.print(f"❌ Error: {e}", style="red")
-        if ctx.obj.get('verbose'):
-            console.print_exception()
-        sys.exit(1)
+            return
+    
+    success, output = git_agent._run_git_command(["commit", "-a", "-m", message])
+    if success:
+        console.print("✅ Commit successful", style="green")
+    else:
+        console.print(f"❌ Commit failed: {output}", style="red")
 
 
 if __name__ == '__main__':
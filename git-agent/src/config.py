@@ -3,15 +3,45 @@
 Configuration management for Git Agent
 """
 
-import json
 import os
 import logging
+import re
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field, fields
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional, Tuple, Type, TypeVar
 
+# orjson parses and writes the settings file several times faster; fall back to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
 
-class LLMProviderConfig(BaseModel):
+T = TypeVar("T")
+
+# ${VAR} references in config values
+_ENV_RE = re.compile(r"\$\{([^}]+)\}")
+
+
+def _loads(data: bytes) -> Any:
+    """Parse a JSON document"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(data: Any) -> bytes:
+    """Serialize a JSON document with 2-space indentation"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+@dataclass(slots=True)
+class LLMProviderConfig:
     """Configuration for LLM provider"""
     enabled: bool = False
     api_key: str = ""
@@ -19,9 +49,26 @@ class LLMProviderConfig(BaseModel):
     temperature: float = 0.3
     max_tokens: int = 1000
     base_url: Optional[str] = None
+    concurrency_limit: int = 8
+    cache_path: str = ""
+    cache_ttl: Optional[int] = None
+    # Extra keys/endpoints pooled under this provider, and each one's TPM quota
+    api_keys: List[str] = field(default_factory=list)
+    endpoints: List[Dict[str, Any]] = field(default_factory=list)
+    tpm_limit: int = 0
+    # Dispatch batches in bins of similar output length
+    length_binning: bool = False
+    max_concurrent_bins: int = 1
+    # Send a 1-token request when the provider is added, to pay connection setup up front
+    warm: bool = False
+    # Constant instructions sent as the system message of every request
+    system_prompt: str = ""
+    # Send the nonstandard cache_prompt field (llama.cpp-style OpenAI-compatible servers)
+    cache_prompt: bool = False
 
 
-class GitSettings(BaseModel):
+@dataclass(slots=True)
+class GitSettings:
     """Git operation settings"""
     auto_stash: bool = True
     force_push_allowed: bool = True
@@ -30,16 +77,51 @@ class GitSettings(BaseModel):
     conflict_resolution_strategy: str = "llm_guided"
 
 
-class LoggingConfig(BaseModel):
+@dataclass(slots=True)
+class LoggingConfig:
     """Logging configuration"""
     level: str = "INFO"
     file: str = "git_agent.log"
     console: bool = True
 
 
+def _from_dict(cls: Type[T], data: Dict[str, Any]) -> T:
+    """Build a settings dataclass from a config section, ignoring unknown keys"""
+    names = {field.name for field in fields(cls)}
+    return cls(**{key: value for key, value in data.items() if key in names})
+
+
+@lru_cache(maxsize=None)
+def _find_config_file_cached(cwd: str) -> str:
+    """Locate settings.config starting from cwd (searched once per directory)"""
+    # Try current directory first
+    current_dir = Path(cwd)
+    config_file = current_dir / "settings.config"
+    if config_file.exists():
+        return str(config_file)
+    
+    # Try git-agent directory
+    git_agent_dir = current_dir / "git-agent"
+    config_file = git_agent_dir / "settings.config"
+    if config_file.exists():
+        return str(config_file)
+    
+    # Try parent directories
+    for parent in current_dir.parents:
+        config_file = parent / "git-agent" / "settings.config"
+        if config_file.exists():
+            return str(config_file)
+    
+    # Default fallback
+    return str(current_dir / "settings.config")
+
+
 class Config:
     """Main configuration manager"""
     
+    # Parsed settings files keyed by (path, mtime_ns); treat the values as read-only
+    _parsed_cache: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    
     def __init__(self, config_path: Optional[str] = None):
         self.config_path = config_path or self._find_config_file()
         self.llm_providers: Dict[str, LLMProviderConfig] = {}
@@ -49,33 +131,23 @@ class Config:
     
     def _find_config_file(self) -> str:
         """Find settings.config file"""
-        # Try current directory first
-        current_dir = Path.cwd()
-        config_file = current_dir / "settings.config"
-        if config_file.exists():
-            return str(config_file)
-        
-        # Try git-agent directory
-        git_agent_dir = current_dir / "git-agent"
-        config_file = git_agent_dir / "settings.config"
-        if config_file.exists():
-            return str(config_file)
-        
-        # Try parent directories
-        for parent in current_dir.parents:
-            config_file = parent / "git-agent" / "settings.config"
-            if config_file.exists():
-                return str(config_file)
-        
-        # Default fallback
-        return str(current_dir / "settings.config")
+        return _find_config_file_cached(str(Path.cwd()))
     
     def _expand_env_vars(self, value: str) -> str:
-        """Expand environment variables in config values"""
-        if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
-            env_var = value[2:-1]
-            return os.getenv(env_var, "")
-        return value
+        """Expand ${VAR} references in config values (unset variables expand to "")"""
+        if not isinstance(value, str) or "${" not in value:
+            return value
+        return _ENV_RE.sub(lambda match: os.environ.get(match.group(1), ""), value)
+    
+    def _read_config_file(self) -> Dict[str, Any]:
+        """Parsed settings file, reused until the file's mtime changes"""
+        key = (self.config_path, os.stat(self.config_path).st_mtime_ns)
+        config_data = self._parsed_cache.get(key)
+        if config_data is None:
+            with open(self.config_path, 'rb') as f:
+                config_data = _loads(f.read())
+            self._parsed_cache[key] = config_data
+        return config_data
     
     def _load_config(self):
         """Load configuration from file"""
@@ -84,25 +156,31 @@ class Config:
             return
         
         try:
-            with open(self.config_path, 'r') as f:
-                config_data = json.load(f)
+            config_data = self._read_config_file()
             
             # Load LLM providers
             if "llm_providers" in config_data:
                 for name, provider_config in config_data["llm_providers"].items():
-                    # Expand environment variables
+                    # Expand environment variables (on a copy; the parsed file is shared)
                     if "api_key" in provider_config:
-                        provider_config["api_key"] = self._expand_env_vars(provider_config["api_key"])
+                        provider_config = dict(provider_config, api_key=self._expand_env_vars(provider_config["api_key"]))
+                    if "api_keys" in provider_config:
+                        provider_config = dict(provider_config, api_keys=[self._expand_env_vars(key) for key in provider_config["api_keys"]])
+                    if "endpoints" in provider_config:
+                        provider_config = dict(provider_config, endpoints=[
+                            {key: self._expand_env_vars(value) for key, value in endpoint.items()}
+                            for endpoint in provider_config["endpoints"]
+                        ])
                     
-                    self.llm_providers[name] = LLMProviderConfig(**provider_config)
+                    self.llm_providers[name] = _from_dict(LLMProviderConfig, provider_config)
             
             # Load git settings
             if "git_settings" in config_data:
-                self.git_settings = GitSettings(**config_data["git_settings"])
+                self.git_settings = _from_dict(GitSettings, config_data["git_settings"])
             
             # Load logging config
             if "logging" in config_data:
-                self.logging_config = LoggingConfig(**config_data["logging"])
+                self.logging_config = _from_dict(LoggingConfig, config_data["logging"])
                 
         except Exception as e:
             logging.error(f"Error loading config: {e}")
@@ -111,7 +189,7 @@ class Config:
     def get_enabled_llm_provider(self) -> Optional[tuple[str, LLMProviderConfig]]:
         """Get the first enabled LLM provider"""
         for name, config in self.llm_providers.items():
-            if config.enabled and config.api_key:
+            if config.enabled and (config.api_key or config.api_keys or config.endpoints):
                 return name, config
         return None
     
@@ -119,28 +197,41 @@ class Config:
         """Save current configuration to file"""
         config_data = {
             "llm_providers": {
-                name: config.model_dump() for name, config in self.llm_providers.items()
+                name: asdict(config) for name, config in self.llm_providers.items()
             },
-            "git_settings": self.git_settings.model_dump(),
-            "logging": self.logging_config.model_dump()
+            "git_settings": asdict(self.git_settings),
+            "logging": asdict(self.logging_config)
         }
         
-        with open(self.config_path, 'w') as f:
-            json.dump(config_data, f, indent=2)
+        with open(self.config_path, 'wb') as f:
+            f.write(_dumps(config_data))
 
 
 # Global configuration instance
 _config = None
 
+# Configuration pinned for the current context (e.g. one CLI invocation), which
+# takes precedence over the global instance
+_config_var: ContextVar[Optional[Config]] = ContextVar("git_agent_config", default=None)
+
 def get_config() -> Config:
     """Get global configuration instance"""
+    config = _config_var.get()
+    if config is not None:
+        return config
+    
     global _config
     if _config is None:
         _config = Config()
     return _config
 
+def use_config(config: Config):
+    """Pin config as the configuration returned by get_config() in this context"""
+    _config_var.set(config)
+
 def reload_config():
     """Reload configuration from file"""
     global _config
     _config = None
+    _config_var.set(None)
     return get_config()
\ No newline at end of file
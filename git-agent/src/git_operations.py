@@ -3,20 +3,16 @@
 Git operations handler with LLM-powered conflict resolution
 """
 
+import json
 import logging
 import os
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 
-try:
-    from git import Repo, GitCommandError, InvalidGitRepositoryError
-    GIT_PYTHON_AVAILABLE = True
-except ImportError:
-    GIT_PYTHON_AVAILABLE = False
-
 try:
     from .config import get_config
     from .llm_providers import LLMManager
@@ -26,6 +22,121 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+_json_decoder = json.JSONDecoder()
+
+# Environment for every git call: stable (untranslated, UTF-8) output, no optional
+# index lock writes, and never block on a credential prompt or pager
+_GIT_ENV = {
+    **os.environ,
+    "LC_ALL": "C.UTF-8",
+    "GIT_OPTIONAL_LOCKS": "0",
+    "GIT_TERMINAL_PROMPT": "0",
+    "GIT_PAGER": "cat"
+}
+
+# Read-only, machine-readable status of the whole working tree
+_STATUS_COMMAND = [
+    "--no-optional-locks", "status", "--porcelain=v2", "--branch",
+    "-z", "--untracked-files=normal"
+]
+
+# Conflicted paths listed in a prompt beyond this are summarized as a count
+MAX_PROMPT_CONFLICTS = 50
+
+_PROMPT_TEMPLATE = """
+You are an expert Git operations assistant. I need help with a Git {operation} operation that encountered issues.
+
+Current repository status:
+- Clean working directory: {clean}
+- Staged files: {n_staged} files
+- Modified files: {n_modified} files  
+- Untracked files: {n_untracked} files
+- Merge conflicts: {n_conflicts} files
+- Commits ahead: {ahead}
+- Commits behind: {behind}
+
+{error_section}{conflict_section}
+Please provide a step-by-step solution to successfully complete the {operation} operation. 
+Your response should be a JSON object with this structure:
+{{
+    "strategy": "brief description of the approach",
+    "steps": [
+        {{"command": "git command", "description": "what this does"}},
+        {{"command": "git command", "description": "what this does"}}
+    ],
+    "requires_force": true/false,
+    "safe_to_proceed": true/false,
+    "risk_level": "low/medium/high"
+}}
+
+Focus on preserving data and ensuring the operation succeeds safely.
+"""
+
+
+def _extract_first_json(text: str) -> Optional[Dict[str, Any]]:
+    """First complete JSON object embedded in text, or None
+    
+    Each '{' is tried as the start of an object with raw_decode, which stops at
+    the object's closing brace; braces in surrounding prose are skipped over.
+    """
+    start = text.find('{')
+    while start >= 0:
+        try:
+            value, _ = _json_decoder.raw_decode(text, start)
+            if isinstance(value, dict):
+                return value
+        except json.JSONDecodeError:
+            pass
+        start = text.find('{', start + 1)
+    return None
+
+
+def _parse_status_v2(output: bytes) -> Dict[str, Any]:
+    """File lists and ahead/behind counts from `git status --porcelain=v2 --branch -z`
+    
+    Entries are dispatched on their first byte and only the path field is
+    decoded; the rest of each line is never turned into a str.
+    """
+    status = {
+        "staged_files": [],
+        "modified_files": [],
+        "untracked_files": [],
+        "conflicts": [],
+        "ahead": 0,
+        "behind": 0
+    }
+    
+    entries = output.split(b'\0')
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if not entry:
+            continue
+        kind = entry[0]
+        
+        if kind == 0x31 or kind == 0x32:  # '1' ordinary, '2' rename/copy
+            # "1 XY sub mH mI mW hH hI path"; renames/copies carry one more
+            # field and are followed by the original path
+            path = os.fsdecode(entry.split(b' ', 8 if kind == 0x31 else 9)[-1])
+            if entry[2] != 0x2E:  # X (index) is not '.'
+                status["staged_files"].append(path)
+            if entry[3] != 0x2E:  # Y (worktree) is not '.'
+                status["modified_files"].append(path)
+            if kind == 0x32:
+                i += 1
+        elif kind == 0x3F:  # '?' untracked
+            status["untracked_files"].append(os.fsdecode(entry[2:]))
+        elif kind == 0x75:  # 'u' unmerged
+            status["conflicts"].append(os.fsdecode(entry.split(b' ', 10)[-1]))
+        elif entry.startswith(b'# branch.ab '):
+            # Only present when an upstream is set: "# branch.ab +N -M"
+            ahead, behind = entry[12:].split()
+            status["ahead"] = int(ahead)
+            status["behind"] = -int(behind)
+    
+    return status
+
 
 class GitOperationResult:
     """Result of a git operation"""
@@ -40,24 +151,22 @@ class GitOperationResult:
 class GitAgent:
     """LLM-powered Git repository management agent"""
     
-    def __init__(self, repo_path: str, llm_manager: LLMManager):
+    def __init__(self, repo_path: str, llm_manager: LLMManager, fetch_before_status: bool = False):
         self.repo_path = Path(repo_path).resolve()
         self.llm_manager = llm_manager
+        # Fetching (network I/O) keeps ahead/behind current; off for plain status
+        self.fetch_before_status = fetch_before_status
         self.config = get_config()
-        self.repo = None
         self._initialize_repo()
     
     def _initialize_repo(self):
         """Initialize git repository"""
-        if not GIT_PYTHON_AVAILABLE:
-            raise ImportError("GitPython library is required. Install with: pip install GitPython")
-        
-        try:
-            self.repo = Repo(self.repo_path)
-            logger.info(f"Initialized Git repository at: {self.repo_path}")
-        except InvalidGitRepositoryError:
+        success, output = self._run_git_command(["rev-parse", "--show-toplevel"])
+        if not success:
             logger.error(f"Invalid Git repository: {self.repo_path}")
-            raise
+            raise ValueError(f"Invalid Git repository: {self.repo_path} ({output})")
+        
+        logger.info(f"Initialized Git repository at: {self.repo_path}")
     
     def _run_git_command(self, command: List[str]) -> Tuple[bool, str]:
         """Run git command and return result"""
@@ -65,8 +174,10 @@ class GitAgent:
             result = subprocess.run(
                 ["git"] + command,
                 cwd=self.repo_path,
+                env=_GIT_ENV,
                 capture_output=True,
-                text=True,
+                encoding="utf-8",
+                errors="replace",
                 timeout=60
             )
             success = result.returncode == 0
@@ -77,6 +188,23 @@ class GitAgent:
         except Exception as e:
             return False, str(e)
     
+    def _run_git_command_bytes(self, command: List[str]) -> Tuple[bool, bytes]:
+        """Run git command and return its undecoded output"""
+        try:
+            result = subprocess.run(
+                ["git"] + command,
+                cwd=self.repo_path,
+                env=_GIT_ENV,
+                capture_output=True,
+                timeout=60
+            )
+            success = result.returncode == 0
+            return success, result.stdout if success else result.stderr.strip()
+        except subprocess.TimeoutExpired:
+            return False, b"Command timed out"
+        except Exception as e:
+            return False, str(e).encode()
+    
     def _create_backup(self) -> Optional[str]:
         """Create backup of current state"""
         if not self.config.git_settings.backup_before_operations:
@@ -87,11 +215,11 @@ class GitAgent:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_branch = f"backup/git_agent_{timestamp}"
             
-            success, output = self._run_git_command(["checkout", "-b", backup_branch])
+            # Branch off HEAD without checking it out (one git call, HEAD and
+            # the working tree are never touched)
+            success, output = self._run_git_command(["branch", backup_branch])
             if success:
                 logger.info(f"Created backup branch: {backup_branch}")
-                # Switch back to original branch
-                self._run_git_command(["checkout", "-"])
                 return backup_branch
             else:
                 logger.warning(f"Failed to create backup: {output}")
@@ -100,8 +228,26 @@ class GitAgent:
             logger.error(f"Error creating backup: {e}")
             return None
     
-    def _analyze_git_status(self) -> Dict[str, Any]:
-        """Analyze current git status"""
+    def _fetch_ahead_behind(self) -> Optional[Tuple[int, int]]:
+        """Fetch origin, then count commits ahead of and behind the upstream"""
+        success, output = self._run_git_command(["fetch", "origin"])
+        if not success:
+            logger.debug(f"Fetch failed: {output}")
+        
+        success, output = self._run_git_command(["rev-list", "--left-right", "--count", "HEAD...@{upstream}"])
+        if not success:
+            return None  # Remote tracking might not be set up
+        ahead, behind = output.split()
+        return int(ahead), int(behind)
+    
+    def _analyze_git_status(self, fetch: Optional[bool] = None) -> Dict[str, Any]:
+        """Analyze current git status
+        
+        Everything comes from a single porcelain v2 status call. fetch (defaults to
+        fetch_before_status) also updates the remote-tracking branch (network I/O)
+        and recounts ahead/behind afterwards, in the background while the working
+        tree is scanned.
+        """
         status = {
             "clean": True,
             "staged_files": [],
@@ -112,30 +258,30 @@ class GitAgent:
             "behind": 0
         }
         
+        if fetch is None:
+            fetch = self.fetch_before_status
+        
         try:
-            # Check status
-            if self.repo.is_dirty():
-                status["clean"] = False
-                status["staged_files"] = [item.a_path for item in self.repo.index.diff("HEAD")]
-                status["modified_files"] = [item.a_path for item in self.repo.index.diff(None)]
-                status["untracked_files"] = self.repo.untracked_files
+            counts = None
+            if fetch:
+                # Fetch and recount on a short-lived worker while the tree is scanned
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    ahead_behind = pool.submit(self._fetch_ahead_behind)
+                    success, output = self._run_git_command_bytes(_STATUS_COMMAND)
+                    counts = ahead_behind.result()
+            else:
+                success, output = self._run_git_command_bytes(_STATUS_COMMAND)
+            
+            if not success:
+                logger.error(f"Error analyzing git status: {output.decode('utf-8', 'replace')}")
+                return status
             
-            # Check for conflicts
-            success, output = self._run_git_command(["diff", "--name-only", "--diff-filter=U"])
-            if success and output:
-                status["conflicts"] = output.split('\n')
+            status.update(_parse_status_v2(output))
+            if counts is not None:
+                status["ahead"], status["behind"] = counts
             
-            # Check ahead/behind
-            try:
-                origin = self.repo.remotes.origin
-                origin.fetch()
-                current_branch = self.repo.active_branch.name
-                ahead = len(list(self.repo.iter_commits(f'origin/{current_branch}..HEAD')))
-                behind = len(list(self.repo.iter_commits(f'HEAD..origin/{current_branch}')))
-                status["ahead"] = ahead
-                status["behind"] = behind
-            except:
-                pass  # Remote tracking might not be set up
+            # Untracked files alone don't make the tree dirty
+            status["clean"] = not (status["staged_files"] or status["modified_files"] or status["conflicts"])
             
         except Exception as e:
             logger.error(f"Error analyzing git status: {e}")
@@ -145,58 +291,31 @@ class GitAgent:
     def _generate_llm_prompt(self, operation: str, status: Dict[str, Any], error_details: str = "") -> str:
         """Generate prompt for LLM to solve git issues"""
         
-        base_prompt = f"""
-You are an expert Git operations assistant. I need help with a Git {operation} operation that encountered issues.
-
-Current repository status:
-- Clean working directory: {status['clean']}
-- Staged files: {len(status['staged_files'])} files
-- Modified files: {len(status['modified_files'])} files  
-- Untracked files: {len(status['untracked_files'])} files
-- Merge conflicts: {len(status['conflicts'])} files
-- Commits ahead: {status['ahead']}
-- Commits behind: {status['behind']}
-
-"""
-        
-        if error_details:
-            base_prompt += f"\nError encountered: {error_details}\n"
-        
-        if status['conflicts']:
-            base_prompt += f"\nConflicted files:\n" + "\n".join(f"- {f}" for f in status['conflicts'])
-        
-        base_prompt += f"""
-Please provide a step-by-step solution to successfully complete the {operation} operation. 
-Your response should be a JSON object with this structure:
-{{
-    "strategy": "brief description of the approach",
-    "steps": [
-        {{"command": "git command", "description": "what this does"}},
-        {{"command": "git command", "description": "what this does"}}
-    ],
-    "requires_force": true/false,
-    "safe_to_proceed": true/false,
-    "risk_level": "low/medium/high"
-}}
-
-Focus on preserving data and ensuring the operation succeeds safely.
-"""
-        
-        return base_prompt
+        conflicts = status['conflicts']
+        conflict_lines = "\n".join(f"- {f}" for f in conflicts[:MAX_PROMPT_CONFLICTS])
+        if len(conflicts) > MAX_PROMPT_CONFLICTS:
+            conflict_lines += f"\n- ... and {len(conflicts) - MAX_PROMPT_CONFLICTS} more"
+        
+        return _PROMPT_TEMPLATE.format_map({
+            "operation": operation,
+            "clean": status['clean'],
+            "n_staged": len(status['staged_files']),
+            "n_modified": len(status['modified_files']),
+            "n_untracked": len(status['untracked_files']),
+            "n_conflicts": len(conflicts),
+            "ahead": status['ahead'],
+            "behind": status['behind'],
+            "error_section": f"\nError encountered: {error_details}\n" if error_details else "",
+            "conflict_section": f"\nConflicted files:\n{conflict_lines}" if conflicts else ""
+        })
     
     def _parse_llm_response(self, response: str) -> Optional[Dict[str, Any]]:
         """Parse LLM response for git strategy"""
-        try:
-            import json
-            # Extract JSON from response if it's embedded in text
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            if start >= 0 and end > start:
-                json_str = response[start:end]
-                return json.loads(json_str)
-        except Exception as e:
-            logger.error(f"Failed to parse LLM response: {e}")
-        return None
+        # Extract JSON from response if it's embedded in text
+        strategy = _extract_first_json(response)
+        if strategy is None:
+            logger.error("Failed to parse LLM response: no JSON object found")
+        return strategy
     
     def _execute_llm_strategy(self, strategy: Dict[str, Any]) -> GitOperationResult:
         """Execute LLM-suggested strategy"""
@@ -284,8 +403,8 @@ Focus on preserving data and ensuring the operation succeeds safely.
         if not self.llm_manager.is_available():
             return GitOperationResult(False, "Pull failed and no LLM available for resolution", output)
         
-        # Get fresh status after failed pull
-        status = self._analyze_git_status()
+        # Get fresh status after failed pull (which has just fetched)
+        status = self._analyze_git_status(fetch=False)
         
         # Generate LLM prompt
         prompt = self._generate_llm_prompt("pull", status, output)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of LLM responses for Git Agent
+"""
+
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+
+class ResponseCache:
+    """SQLite-backed store of LLM replies keyed by a request hash"""
+
+    def __init__(self, db_path: str, ttl: Optional[float] = None):
+        self.db_path = db_path
+        # Entries older than ttl seconds are ignored (kept forever when None)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        # Autocommit connection; WAL lets concurrent CLI runs read while one writes
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, response TEXT, ts INTEGER)'
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute('SELECT response, ts FROM cache WHERE key = ?', (key,)).fetchone()
+
+        if row is None:
+            return None
+        response, ts = row
+        if self.ttl is not None and ts + self.ttl < time.time():
+            return None
+        return response
+
+    def set(self, key: str, response: str):
+        """Store a response"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (key, response, ts) VALUES (?, ?, ?)',
+                (key, response, int(time.time()))
+            )
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def open_cache(db_path: str, ttl: Optional[float] = None) -> ResponseCache:
+    """Shared ResponseCache for db_path, so providers using one file share a connection"""
+    return ResponseCache(db_path, ttl)
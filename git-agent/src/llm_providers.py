@@ -3,37 +3,435 @@
 LLM provider implementations for Git Agent
 """
 
+import asyncio
+import contextlib
+import functools
+import hashlib
+import importlib.util
 import logging
 import os
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from bisect import bisect_right
+from collections import defaultdict, deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, Optional, Dict, Any, Tuple, Type, TypeVar
+
+try:
+    from .llm_cache import ResponseCache, open_cache
+except ImportError:
+    from llm_cache import ResponseCache, open_cache
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Event loop behind the synchronous API (see run_sync)
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Run an LLM coroutine to completion from synchronous code
+    
+    The async SDK clients keep their connections bound to the loop they first ran
+    on, so every synchronous call shares one loop rather than asyncio.run()'s
+    fresh loop per call.
+    """
+    global _sync_loop
+    if _sync_loop is None or _sync_loop.is_closed():
+        _sync_loop = asyncio.new_event_loop()
+    return _sync_loop.run_until_complete(awaitable)
+
+
+# Transient failures (rate limits, 5xx, dropped connections) are retried with
+# exponential backoff and full jitter, waiting at least any Retry-After
+MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+# Sliding window over which each provider instance's token usage is tracked
+USAGE_WINDOW_SECONDS = 60.0
+
+# How long a rate-limited pool instance is skipped when the server gives no Retry-After
+RATE_LIMIT_COOLDOWN = 10.0
+
+
+# Upper bounds (in tokens) of the predicted-output-length bins used to group
+# batched prompts; anything longer falls in a final open-ended bin
+OUTPUT_LEN_BINS = (64, 256, 1024)
+
+
+class RateLimitedError(Exception):
+    """A pooled provider instance was rate limited and the request should move on"""
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    """HTTP status carried by a provider error, if any"""
+    # OpenAI/Anthropic APIStatusError carry status_code; google.api_core errors carry code
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(exc, "code", None)
+    return status if isinstance(status, int) else None
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Whether a provider error is worth retrying"""
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    
+    # Connection and timeout errors (APIConnectionError, APITimeoutError, ...)
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    name = type(exc).__name__
+    return name.endswith("ConnectionError") or name.endswith("TimeoutError")
+
+
+def _retry_after(exc: Exception) -> float:
+    """Seconds the server asked us to wait before retrying, 0 if unspecified"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return 0.0
+    try:
+        return float(headers.get("retry-after") or 0)
+    except ValueError:
+        return 0.0  # HTTP-date form is not worth parsing for these APIs
+
+
+# Vendor SDKs are imported on first use and only once, so a run that uses one
+# provider never pays for importing the others (None if not installed)
+@functools.cache
+def _get_genai():
+    try:
+        import google.generativeai as genai
+        return genai
+    except ImportError:
+        return None
+
+
+@functools.cache
+def _get_openai():
+    try:
+        import openai
+        return openai
+    except ImportError:
+        return None
+
+
+@functools.cache
+def _get_anthropic():
+    try:
+        import anthropic
+        return anthropic
+    except ImportError:
+        return None
+
+
+@functools.cache
+def _get_tiktoken():
+    try:
+        import tiktoken
+        return tiktoken
+    except ImportError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding_for_model(model: str) -> Optional[Any]:
+    """tiktoken encoding shared by every provider of model, or None (no tiktoken, or a model it doesn't know)"""
+    tiktoken = _get_tiktoken()
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        return None
+
+
+# Context window sizes in tokens by exact model name; variants not listed here
+# (new snapshots, fine-tunes) are sent unchecked
+CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-3.5-turbo-0125": 16385,
+    "gpt-3.5-turbo-1106": 16385,
+    "gpt-3.5-turbo-instruct": 4096,
+    "gpt-4": 8192,
+    "gpt-4-0613": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-32k-0613": 32768,
+    "gpt-4-1106-preview": 128000,
+    "gpt-4-0125-preview": 128000,
+    "gpt-4-turbo-preview": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4-turbo-2024-04-09": 128000,
+    "gpt-4.5-preview": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-2024-05-13": 128000,
+    "gpt-4o-2024-08-06": 128000,
+    "gpt-4o-2024-11-20": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4o-mini-2024-07-18": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-4.1-mini": 1047576,
+    "gpt-4.1-nano": 1047576,
+    "claude-3-opus-20240229": 200000,
+    "claude-3-sonnet-20240229": 200000,
+    "claude-3-haiku-20240307": 200000,
+    "claude-3-5-sonnet-20240620": 200000,
+    "claude-3-5-sonnet-20241022": 200000,
+    "claude-3-5-haiku-20241022": 200000,
+    "claude-3-7-sonnet-20250219": 200000,
+    "gemini-pro": 32760,
+    "gemini-1.0-pro": 32760,
+    "gemini-1.5-pro": 2097152,
+    "gemini-1.5-flash": 1048576,
+    "gemini-2.0-flash": 1048576,
+}
+
+
+def context_window(model: str) -> Optional[int]:
+    """Context window of model in tokens, or None if the model isn't listed"""
+    return CONTEXT_WINDOWS.get(model)
+
+
+# HTTP/2 multiplexing needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# One pooled async HTTP client per SDK module, shared by all of its providers
+_http_clients: Dict[str, Any] = {}
+
+
+def _shared_http_client(sdk) -> Optional[Any]:
+    """Keep-alive (and HTTP/2 when available) client shared by every provider of sdk
+    
+    Built with the SDK's own DefaultAsyncHttpxClient so its default timeouts and
+    connection limits apply; None if the SDK is too old to provide one.
+    """
+    client_class = getattr(sdk, "DefaultAsyncHttpxClient", None)
+    if client_class is None:
+        return None
+    
+    client = _http_clients.get(sdk.__name__)
+    if client is None:
+        client = _http_clients[sdk.__name__] = client_class(http2=HTTP2_AVAILABLE)
+    return client
+
+
+async def aclose_http_clients():
+    """Close the shared HTTP clients (providers created afterwards get new ones)"""
+    clients = list(_http_clients.values())
+    _http_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+# Provider classes by the name used in the llm_providers config section
+_PROVIDERS: Dict[str, Type["LLMProvider"]] = {}
+
+
+def register(name: str) -> Callable[[Type["LLMProvider"]], Type["LLMProvider"]]:
+    """Class decorator making a provider available to LLMManager.add_provider as name"""
+    def decorator(provider_class: Type["LLMProvider"]) -> Type["LLMProvider"]:
+        _PROVIDERS[name] = provider_class
+        return provider_class
+    return decorator
+
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers"""
     
+    # Provider name used in log messages
+    display_name = "LLM"
+    # Whether each instance has its own client; False when the SDK only has a
+    # process-wide one, so a pool of several keys would share the last key
+    per_instance_client = True
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.model = config.get("model", "")
         self.temperature = config.get("temperature", 0.3)
         self.max_tokens = config.get("max_tokens", 1000)
+        # Instructions shared by every request, sent apart from the prompt so
+        # servers with prefix caching can reuse their processing
+        self.system_prompt = config.get("system_prompt") or ""
+        # Requests this provider may have in flight at once in a batch
+        self.concurrency_limit = config.get("concurrency_limit", 8)
+        # Responses are cached on disk only when a cache_path is configured
+        cache_path = config.get("cache_path")
+        self.cache: Optional[ResponseCache] = open_cache(cache_path, config.get("cache_ttl")) if cache_path else None
+        # Tokens-per-minute quota of this key/endpoint (0 if unknown), the
+        # (timestamp, estimated tokens) of recent requests, and when a rate limit
+        # cooldown ends; used by LLMManager to spread load over a pool
+        self.tpm_limit = config.get("tpm_limit", 0)
+        self._usage: Deque[Tuple[float, int]] = deque()
+        self.cooldown_until = 0.0
+        # Batch prompts of similar expected output length together (see
+        # LLMManager.agenerate_responses), with up to max_concurrent_bins bins in flight;
+        # worth it for self-hosted servers (vLLM, TGI), where short prompts stall
+        # behind long ones in the running batch
+        self.length_binning = bool(config.get("length_binning"))
+        self.max_concurrent_bins = config.get("max_concurrent_bins", 1)
+    
+    def tokens_in_window(self) -> int:
+        """Estimated tokens requested in the last USAGE_WINDOW_SECONDS"""
+        cutoff = time.monotonic() - USAGE_WINDOW_SECONDS
+        while self._usage and self._usage[0][0] < cutoff:
+            self._usage.popleft()
+        return sum(tokens for _, tokens in self._usage)
+    
+    def utilization(self) -> float:
+        """Share of the TPM quota used in the window (raw token count without a quota)"""
+        tokens = self.tokens_in_window()
+        return tokens / self.tpm_limit if self.tpm_limit else float(tokens)
+    
+    def count_tokens(self, prompt: str) -> int:
+        """Tokens in prompt, estimated at ~4 chars/token unless the provider has a tokenizer"""
+        return len(prompt) // 4
+    
+    def counts_tokens_exactly(self) -> bool:
+        """Whether count_tokens uses the model's tokenizer rather than an estimate"""
+        return False
+    
+    def predict_output_len(self, prompt: str, max_tokens: Optional[int] = None) -> int:
+        """Cheap guess of a reply's length in tokens (~0.3 tokens out per token in)"""
+        return min(self._max_tokens(max_tokens), int(0.3 * self.count_tokens(prompt)))
     
     @abstractmethod
-    def generate_response(self, prompt: str) -> Optional[str]:
-        """Generate response from LLM"""
+    async def _agenerate(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """Request a completion of at most max_tokens from the provider's async client (may raise)"""
         pass
     
+    @abstractmethod
+    def _astream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """Stream a completion's text chunks from the provider's async client (may raise)"""
+        pass
+    
+    def _max_tokens(self, max_tokens: Optional[int]) -> int:
+        """Output budget of one request: a caller's hint, capped at the configured max_tokens"""
+        return min(self.max_tokens, max_tokens) if max_tokens else self.max_tokens
+    
+    def _fit_to_context(self, prompt: str, max_tokens: int) -> Optional[int]:
+        """Output budget that fits the model's context window with prompt
+        
+        Returns None if a tokenizer count shows the prompt alone doesn't fit. An
+        estimated count only caps the budget; the request is sent regardless and
+        the API decides.
+        """
+        window = context_window(self.model)
+        if window is None:
+            return max_tokens
+        
+        prompt_tokens = self.count_tokens(self.system_prompt + prompt)
+        if prompt_tokens < window:
+            return min(max_tokens, window - prompt_tokens)
+        if self.counts_tokens_exactly():
+            logger.error("%s prompt of %d tokens exceeds the %d-token context of %s; not sent",
+                         self.display_name, prompt_tokens, window, self.model)
+            return None
+        return max_tokens
+    
+    async def stream_response(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """Yield the reply to prompt in chunks as they are generated
+        
+        Streamed replies bypass the response cache and are not retried, since
+        part of the reply may already have been consumed when an error occurs.
+        """
+        if not self.is_available():
+            return
+        
+        max_tokens = self._fit_to_context(prompt, self._max_tokens(max_tokens))
+        if max_tokens is None:
+            return
+        
+        self._usage.append((time.monotonic(), len(prompt) // 4 + max_tokens))
+        try:
+            async for chunk in self._astream(prompt, max_tokens):
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            logger.error("%s streaming error: %s", self.display_name, e)
+    
+    def _cache_key(self, prompt: str, max_tokens: int) -> str:
+        """Cache key for prompt under this provider's model and sampling settings"""
+        request = f"{self.display_name}|{self.model}|{self.temperature}|{max_tokens}|{self.system_prompt}|{prompt}"
+        return hashlib.blake2b(request.encode('utf-8'), digest_size=16).hexdigest()
+    
+    async def agenerate_response(self, prompt: str, max_tokens: Optional[int] = None,
+                                 failover: bool = False) -> Optional[str]:
+        """Generate response from LLM without blocking the event loop
+        
+        max_tokens lowers the output budget for replies known to be short; it is
+        also cut to what the model's context window leaves after the prompt, and
+        a prompt a tokenizer shows is too long for the context returns None
+        without a request. With
+        failover=True a rate limit raises RateLimitedError (after starting a
+        cooldown) instead of being retried, so a pool can use another instance.
+        """
+        if not self.is_available():
+            return None
+        
+        max_tokens = self._fit_to_context(prompt, self._max_tokens(max_tokens))
+        if max_tokens is None:
+            return None
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(prompt, max_tokens)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Quota is consumed by the prompt plus the completion budget (~4 chars/token)
+        self._usage.append((time.monotonic(), len(prompt) // 4 + max_tokens))
+        response = await self._agenerate_with_retries(prompt, max_tokens, failover)
+        
+        if cache_key is not None and response is not None:
+            self.cache.set(cache_key, response)
+        return response
+    
+    async def _agenerate_with_retries(self, prompt: str, max_tokens: int, failover: bool = False) -> Optional[str]:
+        """_agenerate, retrying transient errors; None once retries are exhausted"""
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                return await self._agenerate(prompt, max_tokens)
+            except Exception as e:
+                if attempt + 1 == MAX_ATTEMPTS or not _is_transient(e):
+                    logger.error("%s generation error: %s", self.display_name, e)
+                    return None
+                
+                delay = max(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)), _retry_after(e))
+                if failover and _status_code(e) == 429:
+                    self.cooldown_until = time.monotonic() + (_retry_after(e) or RATE_LIMIT_COOLDOWN)
+                    raise RateLimitedError(str(e)) from e
+                logger.warning("%s request failed (%s); retrying in %.1fs", self.display_name, e, delay)
+                await asyncio.sleep(delay)
+        return None
+    
+    async def awarm(self):
+        """Exercise the client with a 1-token request so the first real call skips connection setup"""
+        # Straight to the SDK: a cached "ping" reply would skip the round trip
+        await self._agenerate("ping", 1)
+    
+    def generate_response(self, prompt: str, max_tokens: Optional[int] = None) -> Optional[str]:
+        """Generate response from LLM"""
+        return run_sync(self.agenerate_response(prompt, max_tokens))
+    
     @abstractmethod
     def is_available(self) -> bool:
         """Check if LLM provider is available"""
         pass
 
 
+@register("gemini")
 class GeminiProvider(LLMProvider):
     """Google Gemini LLM provider"""
     
+    display_name = "Gemini"
+    # genai.configure() sets one API key for the whole process
+    per_instance_client = False
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.client = None
@@ -41,141 +439,219 @@ class GeminiProvider(LLMProvider):
     
     def _initialize(self):
         """Initialize Gemini client"""
+        genai = _get_genai()
+        if genai is None:
+            logger.error("google-generativeai library not installed")
+            return
+        
         try:
-            import google.generativeai as genai
-            
             api_key = self.config.get("api_key", "")
             if not api_key:
                 logger.warning("Gemini API key not provided")
                 return
             
             genai.configure(api_key=api_key)
-            self.client = genai.GenerativeModel(self.model)
-            logger.info(f"Gemini provider initialized with model: {self.model}")
+            if self.system_prompt:
+                self.client = genai.GenerativeModel(self.model, system_instruction=self.system_prompt)
+            else:
+                self.client = genai.GenerativeModel(self.model)
+            logger.info("Gemini provider initialized with model: %s", self.model)
             
-        except ImportError:
-            logger.error("google-generativeai library not installed")
         except Exception as e:
-            logger.error(f"Failed to initialize Gemini: {e}")
+            logger.error("Failed to initialize Gemini: %s", e)
     
     def is_available(self) -> bool:
         """Check if Gemini is available"""
         return self.client is not None
     
-    def generate_response(self, prompt: str) -> Optional[str]:
+    async def _agenerate(self, prompt: str, max_tokens: int) -> Optional[str]:
         """Generate response using Gemini"""
-        if not self.is_available():
-            return None
-        
-        try:
-            response = self.client.generate_content(
-                prompt,
-                generation_config={
-                    "temperature": self.temperature,
-                    "max_output_tokens": self.max_tokens,
-                }
-            )
-            return response.text
-        except Exception as e:
-            logger.error(f"Gemini generation error: {e}")
-            return None
+        response = await self.client.generate_content_async(
+            prompt,
+            generation_config={
+                "temperature": self.temperature,
+                "max_output_tokens": max_tokens,
+            }
+        )
+        return response.text
+    
+    async def _astream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """Stream a response using Gemini"""
+        response = await self.client.generate_content_async(
+            prompt,
+            generation_config={
+                "temperature": self.temperature,
+                "max_output_tokens": max_tokens,
+            },
+            stream=True
+        )
+        async for chunk in response:
+            # chunk.text raises on chunks without text, e.g. safety-blocked ones
+            # or a final chunk carrying only the finish reason
+            if chunk.parts:
+                yield chunk.text
 
 
+@register("openai")
 class OpenAIProvider(LLMProvider):
     """OpenAI LLM provider"""
     
+    display_name = "OpenAI"
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.client = None
+        self.self_hosted = False
+        self._encoding = None
+        self._system_messages: List[Dict[str, str]] = []
+        self._extra_body: Optional[Dict[str, Any]] = None
         self._initialize()
     
     def _initialize(self):
         """Initialize OpenAI client"""
+        openai = _get_openai()
+        if openai is None:
+            logger.error("openai library not installed")
+            return
+        
         try:
-            import openai
-            
             api_key = self.config.get("api_key", "")
             if not api_key:
                 logger.warning("OpenAI API key not provided")
                 return
             
-            base_url = self.config.get("base_url", "https://api.openai.com/v1")
-            self.client = openai.OpenAI(api_key=api_key, base_url=base_url)
-            logger.info(f"OpenAI provider initialized with model: {self.model}")
+            base_url = self.config.get("base_url") or "https://api.openai.com/v1"
+            self.self_hosted = not base_url.startswith("https://api.openai.com")
+            
+            self.client = openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=_shared_http_client(openai),
+                max_retries=0  # retried with backoff in _agenerate_with_retries
+            )
+            self._encoding = _encoding_for_model(self.model)
+            if self.system_prompt:
+                self._system_messages = [{"role": "system", "content": self.system_prompt}]
+            if self.config.get("cache_prompt"):
+                # Nonstandard field asking llama.cpp-style servers to keep the prompt's
+                # KV cache for reuse; other APIs may reject it, so only sent on request
+                self._extra_body = {"cache_prompt": True}
+            logger.info("OpenAI provider initialized with model: %s", self.model)
             
-        except ImportError:
-            logger.error("openai library not installed")
         except Exception as e:
-            logger.error(f"Failed to initialize OpenAI: {e}")
+            logger.error("Failed to initialize OpenAI: %s", e)
     
     def is_available(self) -> bool:
         """Check if OpenAI is available"""
         return self.client is not None
     
-    def generate_response(self, prompt: str) -> Optional[str]:
+    async def _agenerate(self, prompt: str, max_tokens: int) -> Optional[str]:
         """Generate response using OpenAI"""
-        if not self.is_available():
-            return None
-        
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            logger.error(f"OpenAI generation error: {e}")
-            return None
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[*self._system_messages, {"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            max_tokens=max_tokens,
+            extra_body=self._extra_body
+        )
+        return response.choices[0].message.content
+    
+    async def _astream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """Stream a response using OpenAI"""
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[*self._system_messages, {"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            max_tokens=max_tokens,
+            extra_body=self._extra_body,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+    
+    def count_tokens(self, prompt: str) -> int:
+        """Tokens in prompt, counted with tiktoken when available"""
+        if self._encoding is None:
+            return super().count_tokens(prompt)
+        return len(self._encoding.encode(prompt, disallowed_special=()))
+    
+    def counts_tokens_exactly(self) -> bool:
+        """True when tiktoken knows the model"""
+        return self._encoding is not None
+    
+    async def awarm(self):
+        """Warm the client, first listing models so a self-hosted server loads its model"""
+        if self.self_hosted:
+            await self.client.models.list()
+        await super().awarm()
 
 
+@register("anthropic")
 class AnthropicProvider(LLMProvider):
     """Anthropic Claude LLM provider"""
     
+    display_name = "Anthropic"
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.client = None
         self._initialize()
     
+    @property
+    def _system(self) -> Dict[str, str]:
+        """system argument for the Messages API (omitted when there is no system prompt)"""
+        return {"system": self.system_prompt} if self.system_prompt else {}
+    
     def _initialize(self):
         """Initialize Anthropic client"""
+        anthropic = _get_anthropic()
+        if anthropic is None:
+            logger.error("anthropic library not installed")
+            return
+        
         try:
-            import anthropic
-            
             api_key = self.config.get("api_key", "")
             if not api_key:
                 logger.warning("Anthropic API key not provided")
                 return
             
-            self.client = anthropic.Anthropic(api_key=api_key)
-            logger.info(f"Anthropic provider initialized with model: {self.model}")
+            self.client = anthropic.AsyncAnthropic(
+                api_key=api_key,
+                http_client=_shared_http_client(anthropic),
+                max_retries=0  # retried with backoff in _agenerate_with_retries
+            )
+            logger.info("Anthropic provider initialized with model: %s", self.model)
             
-        except ImportError:
-            logger.error("anthropic library not installed")
         except Exception as e:
-            logger.error(f"Failed to initialize Anthropic: {e}")
+            logger.error("Failed to initialize Anthropic: %s", e)
     
     def is_available(self) -> bool:
         """Check if Anthropic is available"""
         return self.client is not None
     
-    def generate_response(self, prompt: str) -> Optional[str]:
+    async def _agenerate(self, prompt: str, max_tokens: int) -> Optional[str]:
         """Generate response using Anthropic"""
-        if not self.is_available():
-            return None
-        
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.content[0].text
-        except Exception as e:
-            logger.error(f"Anthropic generation error: {e}")
-            return None
+        response = await self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=self.temperature,
+            messages=[{"role": "user", "content": prompt}],
+            **self._system
+        )
+        return response.content[0].text
+    
+    async def _astream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """Stream a response using Anthropic"""
+        async with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=self.temperature,
+            messages=[{"role": "user", "content": prompt}],
+            **self._system
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
 
 
 class LLMManager:
@@ -184,54 +660,195 @@ class LLMManager:
     def __init__(self):
         self.providers = {}
         self.active_provider = None
-        self._provider_classes = {
-            "gemini": GeminiProvider,
-            "openai": OpenAIProvider,
-            "anthropic": AnthropicProvider
-        }
+        # Requests in progress by cache key, so identical concurrent prompts share one call
+        self._inflight: Dict[str, "asyncio.Task[Optional[str]]"] = {}
     
     def add_provider(self, name: str, config: Dict[str, Any]) -> bool:
-        """Add and initialize LLM provider"""
-        if name not in self._provider_classes:
-            logger.error(f"Unknown provider type: {name}")
+        """Add and initialize LLM provider
+        
+        config may list several "api_keys", or "endpoints" (dicts overriding e.g.
+        api_key and base_url); each becomes one instance in the provider's pool,
+        except for providers without a per-instance client, which use the first.
+        With "warm", every instance is sent a 1-token request before returning.
+        """
+        provider_class = _PROVIDERS.get(name)
+        if provider_class is None:
+            logger.error("Unknown provider type: %s", name)
             return False
         
+        if config.get("endpoints"):
+            instance_configs = [{**config, **endpoint} for endpoint in config["endpoints"]]
+        elif config.get("api_keys"):
+            instance_configs = [{**config, "api_key": api_key} for api_key in config["api_keys"]]
+        else:
+            instance_configs = [config]
+        
+        if len(instance_configs) > 1 and not provider_class.per_instance_client:
+            logger.warning("%s client is process-wide; pooling is not supported, using only the first of %d keys/endpoints",
+                           provider_class.display_name, len(instance_configs))
+            instance_configs = instance_configs[:1]
+        
         try:
-            provider_class = self._provider_classes[name]
-            provider = provider_class(config)
+            pool = [provider_class(instance_config) for instance_config in instance_configs]
+            pool = [provider for provider in pool if provider.is_available()]
             
-            if provider.is_available():
-                self.providers[name] = provider
+            if pool:
+                if config.get("warm"):
+                    run_sync(self._awarm(name, pool))
+                self.providers[name] = pool
                 if self.active_provider is None:
                     self.active_provider = name
-                logger.info(f"Added {name} provider successfully")
+                logger.info("Added %s provider successfully", name)
                 return True
             else:
-                logger.warning(f"Provider {name} is not available")
+                logger.warning("Provider %s is not available", name)
                 return False
                 
         except Exception as e:
-            logger.error(f"Failed to add provider {name}: {e}")
+            logger.error("Failed to add provider %s: %s", name, e)
             return False
     
+    @staticmethod
+    async def _awarm(name: str, pool: List[LLMProvider]):
+        """Warm a provider's instances concurrently, logging how long it took"""
+        start = time.perf_counter()
+        results = await asyncio.gather(*(provider.awarm() for provider in pool), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning("Warm-up of %s provider failed: %s", name, result)
+        logger.info("Warmed up %s provider in %.0f ms", name, (time.perf_counter() - start) * 1000)
+    
     def set_active_provider(self, name: str) -> bool:
         """Set active LLM provider"""
         if name in self.providers:
             self.active_provider = name
-            logger.info(f"Set active provider to: {name}")
+            logger.info("Set active provider to: %s", name)
             return True
         else:
-            logger.error(f"Provider {name} not found")
+            logger.error("Provider %s not found", name)
             return False
     
-    def generate_response(self, prompt: str) -> Optional[str]:
-        """Generate response using active provider"""
+    async def agenerate_response(self, prompt: str, max_tokens: Optional[int] = None) -> Optional[str]:
+        """Generate response using active provider without blocking the event loop"""
         if not self.active_provider or self.active_provider not in self.providers:
             logger.error("No active LLM provider available")
             return None
         
-        provider = self.providers[self.active_provider]
-        return provider.generate_response(prompt)
+        return await self._agenerate_pooled(self.providers[self.active_provider], prompt, max_tokens)
+    
+    @staticmethod
+    def _pick(pool: List[LLMProvider], exclude: List[LLMProvider]) -> LLMProvider:
+        """Least-utilized instance not cooling down from a rate limit (if possible)"""
+        candidates = [provider for provider in pool if provider not in exclude]
+        now = time.monotonic()
+        ready = [provider for provider in candidates if provider.cooldown_until <= now]
+        if ready:
+            return min(ready, key=lambda provider: provider.utilization())
+        return min(candidates, key=lambda provider: provider.cooldown_until)
+    
+    async def _agenerate_pooled(self, pool: List[LLMProvider], prompt: str, max_tokens: Optional[int] = None,
+                                semaphore: Optional[asyncio.Semaphore] = None) -> Optional[str]:
+        """Generate on the pool, joining an identical request already in flight
+        
+        semaphore (if any) is only held while a new request runs, not while
+        waiting on a duplicate.
+        """
+        key = pool[0]._cache_key(prompt, pool[0]._max_tokens(max_tokens))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._agenerate_on_pool(pool, prompt, max_tokens, semaphore))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so a cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(task)
+    
+    async def _agenerate_on_pool(self, pool: List[LLMProvider], prompt: str, max_tokens: Optional[int],
+                                 semaphore: Optional[asyncio.Semaphore]) -> Optional[str]:
+        """Run one request on the pool, holding semaphore while it runs"""
+        async with semaphore or contextlib.nullcontext():
+            return await self._agenerate_with_failover(pool, prompt, max_tokens)
+    
+    async def _agenerate_with_failover(self, pool: List[LLMProvider], prompt: str,
+                                       max_tokens: Optional[int]) -> Optional[str]:
+        """Generate on the least-utilized instance, moving on when one is rate limited"""
+        tried: List[LLMProvider] = []
+        while True:
+            provider = self._pick(pool, tried)
+            tried.append(provider)
+            try:
+                # The last untried instance retries its rate limits itself
+                return await provider.agenerate_response(prompt, max_tokens, failover=len(tried) < len(pool))
+            except RateLimitedError as e:
+                logger.warning("%s instance rate limited (%s); trying another", provider.display_name, e)
+    
+    async def stream_response(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """Yield the active provider's reply in chunks as they are generated"""
+        if not self.active_provider or self.active_provider not in self.providers:
+            logger.error("No active LLM provider available")
+            return
+        
+        provider = self._pick(self.providers[self.active_provider], [])
+        async for chunk in provider.stream_response(prompt, max_tokens):
+            yield chunk
+    
+    def generate_response(self, prompt: str, max_tokens: Optional[int] = None) -> Optional[str]:
+        """Generate response using active provider (max_tokens caps the reply for short outputs)"""
+        return run_sync(self.agenerate_response(prompt, max_tokens))
+    
+    async def agenerate_responses(self, prompts: List[str], max_tokens: Optional[int] = None) -> List[Optional[str]]:
+        """Generate responses for many prompts concurrently, in prompt order
+        
+        At most the active pool's combined concurrency_limit requests are in flight;
+        a prompt that fails yields None without affecting the rest, and identical
+        prompts are requested once. With
+        length_binning, prompts are grouped by predicted output length and the
+        bins are dispatched shortest first, max_concurrent_bins at a time.
+        """
+        if not self.active_provider or self.active_provider not in self.providers:
+            logger.error("No active LLM provider available")
+            return [None] * len(prompts)
+        
+        pool = self.providers[self.active_provider]
+        semaphore = asyncio.Semaphore(sum(provider.concurrency_limit for provider in pool))
+        
+        async def generate_all(batch: List[str]) -> List[Optional[str]]:
+            results = await asyncio.gather(
+                *(self._agenerate_pooled(pool, prompt, max_tokens, semaphore) for prompt in batch),
+                return_exceptions=True
+            )
+            return [None if isinstance(result, BaseException) else result for result in results]
+        
+        if not pool[0].length_binning:
+            return await generate_all(prompts)
+        
+        bins: Dict[int, List[int]] = defaultdict(list)
+        for index, prompt in enumerate(prompts):
+            bins[bisect_right(OUTPUT_LEN_BINS, pool[0].predict_output_len(prompt, max_tokens))].append(index)
+        
+        responses: List[Optional[str]] = [None] * len(prompts)
+        bin_slots = asyncio.Semaphore(pool[0].max_concurrent_bins)
+        
+        async def generate_bin(indices: List[int]):
+            async with bin_slots:
+                results = await generate_all([prompts[index] for index in indices])
+            for index, result in zip(indices, results):
+                responses[index] = result
+        
+        # Semaphore waiters are served in order, so shorter bins go first
+        await asyncio.gather(*(generate_bin(bins[key]) for key in sorted(bins)))
+        return responses
+    
+    def generate_responses(self, prompts: List[str], max_tokens: Optional[int] = None) -> List[Optional[str]]:
+        """Generate responses for many prompts concurrently, in prompt order"""
+        return run_sync(self.agenerate_responses(prompts, max_tokens))
+    
+    async def aclose(self):
+        """Release pooled HTTP connections once the providers are no longer used"""
+        await aclose_http_clients()
+    
+    def close(self):
+        """Release pooled HTTP connections once the providers are no longer used"""
+        run_sync(self.aclose())
     
     def is_available(self) -> bool:
         """Check if any LLM provider is available"""
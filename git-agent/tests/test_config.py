@@ -63,13 +63,13 @@ class TestConfig:
             assert config.git_settings.auto_stash is False
             assert config.git_settings.max_retry_attempts == 5
     
-    def test_env_var_expansion(self):
+    def test_env_var_expansion(self, monkeypatch):
         """Test environment variable expansion"""
         with tempfile.TemporaryDirectory() as tmpdir:
             config_path = Path(tmpdir) / "test_config.json"
             
             # Set environment variable
-            os.environ["TEST_API_KEY"] = "secret-key"
+            monkeypatch.setenv("TEST_API_KEY", "secret-key")
             
             test_config = {
                 "llm_providers": {
@@ -86,9 +86,41 @@ class TestConfig:
             
             config = Config(str(config_path))
             assert config.llm_providers["test"].api_key == "secret-key"
+    
+    def test_env_var_expansion_in_pool_entries(self, monkeypatch):
+        """Test environment variable expansion in api_keys and endpoints"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = Path(tmpdir) / "test_config.json"
+            
+            monkeypatch.setenv("TEST_API_KEY_2", "second-key")
+            monkeypatch.setenv("TEST_ENDPOINT_HOST", "llm.internal")
+            
+            test_config = {
+                "llm_providers": {
+                    "openai": {
+                        "enabled": True,
+                        "api_keys": ["${TEST_API_KEY_2}"],
+                        "endpoints": [
+                            {
+                                "api_key": "${TEST_API_KEY_2}",
+                                "base_url": "http://${TEST_ENDPOINT_HOST}:8000/v1",
+                                "tpm_limit": 1000
+                            }
+                        ],
+                        "model": "test-model"
+                    }
+                }
+            }
             
-            # Cleanup
-            del os.environ["TEST_API_KEY"]
+            with open(config_path, 'w') as f:
+                json.dump(test_config, f)
+            
+            config = Config(str(config_path))
+            provider = config.llm_providers["openai"]
+            assert provider.api_keys == ["second-key"]
+            assert provider.endpoints == [
+                {"api_key": "second-key", "base_url": "http://llm.internal:8000/v1", "tpm_limit": 1000}
+            ]
     
     def test_get_enabled_provider(self):
         """Test getting enabled LLM provider"""
@@ -120,6 +152,23 @@ class TestConfig:
             name, provider_config = result
             assert name == "enabled"
             assert provider_config.api_key == "key2"
+    
+    def test_config_reloaded_after_file_change(self):
+        """Test that a modified config file is parsed again"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = Path(tmpdir) / "test_config.json"
+            
+            with open(config_path, 'w') as f:
+                json.dump({"git_settings": {"max_retry_attempts": 5}}, f)
+            assert Config(str(config_path)).git_settings.max_retry_attempts == 5
+            
+            with open(config_path, 'w') as f:
+                json.dump({"git_settings": {"max_retry_attempts": 7}}, f)
+            # Ensure a distinct mtime even on coarse-grained filesystems
+            stat = os.stat(config_path)
+            os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            
+            assert Config(str(config_path)).git_settings.max_retry_attempts == 7
 
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for Git Agent git operations
+"""
+
+import pytest
+from pathlib import Path
+
+# Add src to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from git_operations import _extract_first_json, _parse_status_v2
+
+
+# Captured `git status --porcelain=v2 --branch -z --untracked-files=normal` output
+# of a clone one commit ahead of and behind origin/main, with a staged file, a
+# modified file, a file with both, a staged rename and an untracked file
+DIRTY_STATUS = (
+    b'# branch.oid 181ee7c8cfe90a2b96575cef6de091b2c276f82e\x00'
+    b'# branch.head main\x00'
+    b'# branch.upstream origin/main\x00'
+    b'# branch.ab +1 -1\x00'
+    b'1 M. N... 100644 100644 100644 78981922613b2afb6025042ff6bd878ac1994e85 '
+    b'19d9cc8584ac2c7dcf57d2680375e80f099dc481 a.txt\x00'
+    b'1 .M N... 100644 100644 100644 f2ad6c76f0115a6ba5b00456a849810e7ec0af20 '
+    b'f2ad6c76f0115a6ba5b00456a849810e7ec0af20 c.txt\x00'
+    b'1 MM N... 100644 100644 100644 40830374235df1c19661a2901b7ca73cc9499f3d '
+    b'49f33a8c6e8bb31f5d7c68f9c298cac55ec7cd85 d.txt\x00'
+    b'2 R. N... 100644 100644 100644 61780798228d17af2d34fce4cfbdf35556832472 '
+    b'61780798228d17af2d34fce4cfbdf35556832472 R100 new name.txt\x00old name.txt\x00'
+    b'? untracked file.txt\x00'
+)
+
+# Captured output in the middle of a merge with one conflicted file, no upstream
+CONFLICT_STATUS = (
+    b'# branch.oid a8993e779b079f8d109f0bc5bda4296d1a66f1f0\x00'
+    b'# branch.head main\x00'
+    b'u UU N... 100644 100644 100644 100644 5626abf0f72e58d7a153368ba57db4c673c0e171 '
+    b'2bdf67abb163a4ffb2d7f3f0880c9fe5068ce782 f719efd430d52bcfc8566a43b2eb655688d38871 f.txt\x00'
+)
+
+
+class TestStatusParsing:
+    """Test parsing of porcelain v2 status output"""
+
+    def test_staged_files(self):
+        """Test that index changes, including the rename target, are staged"""
+        status = _parse_status_v2(DIRTY_STATUS)
+        assert status["staged_files"] == ["a.txt", "d.txt", "new name.txt"]
+
+    def test_modified_files(self):
+        """Test that worktree changes are reported as modified"""
+        status = _parse_status_v2(DIRTY_STATUS)
+        assert status["modified_files"] == ["c.txt", "d.txt"]
+
+    def test_untracked_files(self):
+        """Test untracked entries, including paths with spaces"""
+        status = _parse_status_v2(DIRTY_STATUS)
+        assert status["untracked_files"] == ["untracked file.txt"]
+
+    def test_rename_original_path_is_skipped(self):
+        """Test that the original path after a rename record is not parsed as an entry"""
+        # An original path that looks like an untracked record must not be counted
+        output = DIRTY_STATUS.replace(b'\x00old name.txt\x00', b'\x00? old name.txt\x00')
+        status = _parse_status_v2(output)
+        assert status["untracked_files"] == ["untracked file.txt"]
+        assert "old name.txt" not in status["staged_files"]
+
+    def test_ahead_behind(self):
+        """Test the branch.ab header"""
+        status = _parse_status_v2(DIRTY_STATUS)
+        assert status["ahead"] == 1
+        assert status["behind"] == 1
+        assert status["conflicts"] == []
+
+    def test_unmerged_files(self):
+        """Test that unmerged entries are conflicts and nothing else"""
+        status = _parse_status_v2(CONFLICT_STATUS)
+        assert status["conflicts"] == ["f.txt"]
+        assert status["staged_files"] == []
+        assert status["modified_files"] == []
+
+    def test_no_upstream(self):
+        """Test that ahead/behind stay 0 without a branch.ab header"""
+        status = _parse_status_v2(CONFLICT_STATUS)
+        assert status["ahead"] == 0
+        assert status["behind"] == 0
+
+
+class TestJsonExtraction:
+    """Test extraction of the strategy object from LLM replies"""
+
+    def test_json_in_prose(self):
+        """Test an object surrounded by explanation"""
+        text = 'Here is the plan: {"strategy": "rebase", "steps": []} Let me know if it helps.'
+        assert _extract_first_json(text) == {"strategy": "rebase", "steps": []}
+
+    def test_json_in_code_fence(self):
+        """Test an object inside a ```json fence, with nested objects"""
+        text = (
+            'Sure!\n```json\n'
+            '{"strategy": "merge", "steps": [{"command": "git merge", "description": "merge"}]}\n'
+            '```\nDone.'
+        )
+        assert _extract_first_json(text) == {
+            "strategy": "merge",
+            "steps": [{"command": "git merge", "description": "merge"}]
+        }
+
+    def test_invalid_brace_before_object(self):
+        """Test that a '{' which doesn't start valid JSON is skipped"""
+        text = 'Use {placeholders} like {this}, then: {"strategy": "pull", "safe_to_proceed": true}'
+        assert _extract_first_json(text) == {"strategy": "pull", "safe_to_proceed": True}
+
+    def test_first_of_several_objects(self):
+        """Test that the first complete object wins"""
+        text = '{"strategy": "first"} and later {"strategy": "second"}'
+        assert _extract_first_json(text) == {"strategy": "first"}
+
+    @pytest.mark.parametrize("text", [
+        "",
+        "I could not work out a strategy.",
+        "Unbalanced { brace and [1, 2] list",
+    ])
+    def test_no_json(self, text):
+        """Test that replies without a JSON object return None"""
+        assert _extract_first_json(text) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Tests for LLM provider pooling and request sharing in Git Agent
+"""
+
+import asyncio
+import pytest
+from pathlib import Path
+
+# Add src to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import llm_providers
+from llm_providers import LLMManager, LLMProvider
+
+
+class StubStatusError(Exception):
+    """Provider error carrying an HTTP status, like the SDKs' APIStatusError"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class StubProvider(LLMProvider):
+    """Provider answering from memory, or raising error on every call
+
+    When gate is set, each call waits for the event before answering.
+    """
+
+    display_name = "Stub"
+
+    def __init__(self, name: str, error: Exception = None):
+        super().__init__({"model": "stub-model"})
+        self.name = name
+        self.error = error
+        self.gate = None
+        self.calls = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    async def _agenerate(self, prompt: str, max_tokens: int):
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return f"{self.name}:{prompt}"
+
+    async def _astream(self, prompt: str, max_tokens: int):
+        yield await self._agenerate(prompt, max_tokens)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    """Retry immediately so exhausted retries don't slow the tests down"""
+    monkeypatch.setattr(llm_providers, "RETRY_BASE_DELAY", 0.0)
+
+
+def pooled_manager(*pool: LLMProvider) -> LLMManager:
+    """LLMManager whose active provider is the given pool"""
+    manager = LLMManager()
+    manager.providers["stub"] = list(pool)
+    manager.active_provider = "stub"
+    return manager
+
+
+class TestProviderPool:
+    """Test routing and failover across a provider's pool"""
+
+    def test_least_utilized_instance_is_used(self):
+        """Test that requests go to the instance with the least recent usage"""
+        busy = StubProvider("busy")
+        idle = StubProvider("idle")
+        busy.generate_response("warm-up prompt")
+
+        manager = pooled_manager(busy, idle)
+        assert manager.generate_response("hello") == "idle:hello"
+        assert busy.calls == 1
+
+    def test_rate_limited_instance_fails_over(self):
+        """Test that a rate-limited instance hands the request to the next one"""
+        limited = StubProvider("limited", StubStatusError(429))
+        healthy = StubProvider("healthy")
+
+        manager = pooled_manager(limited, healthy)
+        assert manager.generate_response("hello") == "healthy:hello"
+        assert limited.calls == 1
+        assert healthy.calls == 1
+
+    def test_rate_limited_instance_is_deprioritized(self):
+        """Test that an instance cooling down from a rate limit is skipped"""
+        limited = StubProvider("limited", StubStatusError(429))
+        healthy = StubProvider("healthy")
+        manager = pooled_manager(limited, healthy)
+        manager.generate_response("first")
+
+        # healthy now has more recorded usage, but limited is still cooling down
+        assert manager.generate_response("second") == "healthy:second"
+        assert limited.calls == 1
+        assert healthy.calls == 2
+
+    def test_error_surfaces_when_all_instances_fail(self, caplog):
+        """Test that a request fails, and is logged, when every instance fails"""
+        first = StubProvider("first", StubStatusError(429))
+        second = StubProvider("second", StubStatusError(429))
+
+        manager = pooled_manager(first, second)
+        assert manager.generate_response("hello") is None
+        assert first.calls == 1
+        assert second.calls == llm_providers.MAX_ATTEMPTS
+        assert "Stub generation error: HTTP 429" in caplog.text
+
+    def test_process_wide_client_is_not_pooled(self, monkeypatch, caplog):
+        """Test that a provider without per-instance clients keeps only its first key"""
+        class GlobalClientProvider(StubProvider):
+            per_instance_client = False
+
+            def __init__(self, config):
+                super().__init__(config["api_key"])
+
+        monkeypatch.setitem(llm_providers._PROVIDERS, "global", GlobalClientProvider)
+        manager = LLMManager()
+        assert manager.add_provider("global", {"api_keys": ["key-1", "key-2"]})
+        assert [provider.name for provider in manager.providers["global"]] == ["key-1"]
+        assert "pooling is not supported" in caplog.text
+
+
+class TestContextWindow:
+    """Test the context window check before sending"""
+
+    @pytest.mark.parametrize("model, window", [
+        ("gpt-4", 8192),
+        ("gpt-4-32k", 32768),
+        ("gpt-4-0125-preview", 128000),
+        ("gpt-4-1106-preview", 128000),
+        ("gpt-4.5-preview", 128000),
+        ("gpt-3.5-turbo-instruct", 4096),
+    ])
+    def test_listed_models(self, model, window):
+        """Test that each listed model gets its own window, not a prefix's"""
+        assert llm_providers.context_window(model) == window
+
+    def test_unknown_variant_is_not_checked(self):
+        """Test that a model name not listed exactly is sent with its full budget"""
+        assert llm_providers.context_window("gpt-4-0314-custom") is None
+        provider = StubProvider("stub")
+        provider.model = "gpt-4-0314-custom"
+        assert provider._fit_to_context("x" * 100000, 1000) == 1000
+
+    def test_estimate_only_caps_max_tokens(self):
+        """Test that an estimated count caps the budget but never drops the request"""
+        provider = StubProvider("stub")
+        provider.model = "gpt-4"
+        assert provider._fit_to_context("x" * 4 * 8000, 1000) == 192
+        assert provider._fit_to_context("x" * 4 * 9000, 1000) == 1000
+        assert provider.generate_response("x" * 4 * 9000) is not None
+
+    def test_exact_count_rejects_overlong_prompt(self, monkeypatch):
+        """Test that a tokenizer count over the window drops the request"""
+        provider = StubProvider("stub")
+        provider.model = "gpt-4"
+        monkeypatch.setattr(provider, "counts_tokens_exactly", lambda: True)
+        assert provider._fit_to_context("x" * 4 * 9000, 1000) is None
+        assert provider.generate_response("x" * 4 * 9000) is None
+        assert provider.calls == 0
+
+
+class StubGeminiChunk:
+    """Streamed Gemini chunk; .text raises without parts, like the SDK's"""
+
+    def __init__(self, text: str = None):
+        self.parts = [text] if text is not None else []
+
+    @property
+    def text(self) -> str:
+        if not self.parts:
+            raise ValueError("The response has no text parts")
+        return self.parts[0]
+
+
+class TestGeminiStreaming:
+    """Test streaming replies from Gemini"""
+
+    def test_chunks_without_text_are_skipped(self):
+        """Test that blocked or finish-only chunks don't cut the reply short"""
+        chunks = [StubGeminiChunk("Hello"), StubGeminiChunk(), StubGeminiChunk(" world"), StubGeminiChunk()]
+
+        class StubModel:
+            async def generate_content_async(self, prompt, generation_config, stream=False):
+                async def stream():
+                    for chunk in chunks:
+                        yield chunk
+                return stream()
+
+        provider = llm_providers.GeminiProvider({"model": "gemini-test"})
+        provider.client = StubModel()
+
+        async def collect():
+            return [text async for text in provider.stream_response("hi")]
+
+        assert asyncio.run(collect()) == ["Hello", " world"]
+
+
+class TestInflightSharing:
+    """Test that identical concurrent prompts share one request"""
+
+    def test_identical_prompts_make_one_call(self):
+        """Test that two concurrent identical prompts reach the provider once"""
+        provider = StubProvider("only")
+        manager = pooled_manager(provider)
+
+        async def generate_twice():
+            provider.gate = asyncio.Event()
+            pending = asyncio.gather(manager.agenerate_response("same"), manager.agenerate_response("same"))
+            await asyncio.sleep(0)
+            provider.gate.set()
+            return await pending
+
+        assert asyncio.run(generate_twice()) == ["only:same", "only:same"]
+        assert provider.calls == 1
+        assert manager._inflight == {}
+
+    def test_cancelled_waiter_does_not_cancel_others(self):
+        """Test that cancelling one caller leaves the shared request running for the other"""
+        provider = StubProvider("only")
+        manager = pooled_manager(provider)
+
+        async def cancel_first():
+            provider.gate = asyncio.Event()
+            first = asyncio.create_task(manager.agenerate_response("same"))
+            second = asyncio.create_task(manager.agenerate_response("same"))
+            await asyncio.sleep(0)
+            first.cancel()
+            provider.gate.set()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(cancel_first()) == "only:same"
+        assert provider.calls == 1
+        assert manager._inflight == {}
+
+    def test_failure_reaches_every_waiter(self):
+        """Test that an error in the shared request is raised to each caller and not kept"""
+        provider = StubProvider("only")
+        manager = pooled_manager(provider)
+
+        async def broken_request(prompt, max_tokens=None, failover=False):
+            provider.calls += 1
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        provider.agenerate_response = broken_request
+
+        async def generate_twice():
+            return await asyncio.gather(
+                manager.agenerate_response("same"), manager.agenerate_response("same"),
+                return_exceptions=True
+            )
+
+        results = asyncio.run(generate_twice())
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+        assert provider.calls == 1
+        assert manager._inflight == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])